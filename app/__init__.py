@@ -5,7 +5,28 @@ def create_app():
     app = Flask(__name__)
     app.config['secret_key'] = 'your_secret_key'
 
-    CORS(app)  # enable CORS for the app
+    # enable CORS for the app (and let the browser read our paging header)
+    CORS(app, expose_headers=['X-Next-After-Id'])
+
+    # pooled SQLite connections, returned to the pool after every request
+    from .models import init_app
+    init_app(app)
+
+    # opt-in timing / SQL accounting / GET /metrics (see Config.METRICS_ENABLED)
+    from . import metrics
+    metrics.init_app(app)
+
+    # response cache for the GET routes
+    from . import cache
+    cache.init_app(app)
+
+    # background overdue reminders (opt-in, see Config.REMINDERS_ENABLED)
+    from . import reminders
+    reminders.init_app(app)
+
+    # background Todoist sync (only when TODOIST_API_TOKEN is set)
+    from . import todoist_api
+    todoist_api.init_app(app)
 
     #import and register the routes blueprint
 
@@ -0,0 +1,238 @@
+"""
+ASGI front for the Flask app (served by uvicorn, see asgi.py at the project root).
+
+Logic:
+- /events and the polled dashboard reads (/stats, /tasks/upcoming,
+  /tasks/overdue, /tasks/completed-week) are answered natively on the event
+  loop. Their SQLite work goes through AsyncDB's bounded thread pool, so a
+  slow client or an open live-update stream never pins a worker thread.
+- Every other route is the normal Flask app, run on a bounded WSGI thread pool.
+- The native reads skip the in-process response cache on purpose: they are
+  primary-key / index reads already, and ETag + 304 still apply. With
+  METRICS_ENABLED they are recorded in the same /metrics series as Flask
+  routes (not sampled by the profiler); the long-lived /events stream is not.
+- Lifespan shutdown closes live streams, waits for running requests and
+  queries, then closes the database connections.
+"""
+import asyncio
+import json
+import time
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.http import http_date, parse_date, parse_etags
+
+from config import Config
+from . import metrics, models
+from .async_db import AsyncDB
+from .cache import is_not_modified, validators
+from .events import broker, format_event
+from .models import table_versions
+from .routes import COMPLETED_WEEK_SQL, OVERDUE_TASKS_SQL, UPCOMING_TASKS_SQL
+from .stats import read_stats
+
+# Same CORS answer Flask-CORS gives the rest of the API
+CORS_HEADERS = [(b'access-control-allow-origin', b'*')]
+
+
+def _headers(scope):
+    return {k.decode('latin-1'): v.decode('latin-1') for k, v in scope['headers']}
+
+
+def _full_path(scope):
+    # Same shape as Flask's request.full_path, so ETags match in both modes
+    return f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+
+
+def _json(data):
+    # Same encoding as jsonify (sorted keys, compact)
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode()
+
+
+class DormMateASGI:
+    def __init__(self, flask_app, threads=None, db_threads=None):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=threads or Config.ASGI_THREADS)
+        self.db_threads = db_threads or Config.ASGI_DB_THREADS
+        self.db = None
+        self.stopping = None
+
+        # (method, path) -> (handler, tables its answer depends on)
+        self.routes = {
+            ('GET', '/events'): (self.events, ()),
+            ('GET', '/stats'): (self.read_view(read_stats), ('tasks', 'roommates', 'rooms')),
+            ('GET', '/tasks/upcoming'): (self.query_view(UPCOMING_TASKS_SQL), ('tasks', 'rooms')),
+            ('GET', '/tasks/overdue'): (self.query_view(OVERDUE_TASKS_SQL), ('tasks', 'roommates')),
+            ('GET', '/tasks/completed-week'): (self.query_view(COMPLETED_WEEK_SQL), ('tasks',)),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        if scope['type'] == 'http' and self.db is not None:
+            route = self.routes.get((scope['method'], scope['path']))
+            if route:
+                handler, tables = route
+                if Config.METRICS_ENABLED and handler != self.events:
+                    return await self.measured(handler, scope, receive, send, tables)
+                return await handler(scope, receive, send, tables)
+
+        return await self.wsgi(scope, receive, send)
+
+    async def measured(self, handler, scope, receive, send, tables):
+        """Run a native view and record it like metrics._after_request does for Flask."""
+        start = time.perf_counter()
+        response = {'status': 500, 'size': 0}
+
+        async def recording_send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            else:
+                response['size'] += len(message.get('body', b''))
+            await send(message)
+
+        with metrics.collect_sql(metrics.SQLStats()) as stats:
+            try:
+                await handler(scope, receive, recording_send, tables)
+            finally:
+                metrics.observe_request(scope['path'], scope['method'], response['status'],
+                                        time.perf_counter() - start,
+                                        stats.sql_count, stats.sql_time, response['size'])
+
+    # --- LIFESPAN ---
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def start(self):
+        self.db = AsyncDB(self.db_threads)
+        self.stopping = asyncio.Event()
+
+    async def shutdown(self):
+        """Graceful stop: end live streams, let queued work finish, close connections."""
+        if self.stopping is not None:
+            self.stopping.set()
+        loop = asyncio.get_running_loop()
+        # These wait for running threads, so keep them off the event loop
+        await loop.run_in_executor(None, self.wsgi.executor.shutdown, True)
+        if self.db is not None:
+            await loop.run_in_executor(None, self.db.close)
+        models.close_pool()
+
+    # --- NATIVE READ VIEWS ---
+
+    async def respond(self, send, status, body=b'', headers=()):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json')] + CORS_HEADERS + list(headers),
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def conditional(self, scope, send, tables):
+        """
+        Same ETag / Last-Modified rules as the @conditional decorator.
+        Returns (validator headers, True if a 304 was already sent).
+        """
+        headers = _headers(scope)
+        versions = await self.db.run(table_versions, tables)
+        etag, last_modified = validators(_full_path(scope), versions, tables)
+        validator_headers = [
+            (b'etag', f'W/"{etag}"'.encode()),
+            (b'last-modified', http_date(last_modified).encode()),
+            (b'cache-control', b'no-cache'),
+        ]
+        if_none_match = parse_etags(headers.get('if-none-match'))
+        if_modified_since = parse_date(headers.get('if-modified-since'))
+        if is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+            await self.respond(send, 304, headers=validator_headers)
+            return validator_headers, True
+        return validator_headers, False
+
+    def read_view(self, fn):
+        """Native GET view whose body is fn(conn), e.g. read_stats."""
+        async def view(scope, receive, send, tables):
+            validator_headers, done = await self.conditional(scope, send, tables)
+            if done:
+                return
+            data = await self.db.run(fn)
+            await self.respond(send, 200, _json(data), validator_headers)
+        return view
+
+    def query_view(self, sql):
+        """Native GET view returning every row of one of the dashboard queries."""
+        return self.read_view(lambda conn: [dict(row) for row in conn.execute(sql)])
+
+    # --- LIVE UPDATES ---
+
+    async def events(self, scope, receive, send, tables=()):
+        """Async twin of GET /events: no thread is held while the stream is open."""
+        last_id = _headers(scope).get('last-event-id')
+        subscriber = broker.subscribe(asyncio.get_running_loop())
+
+        async def chunk(text):
+            await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+        async def wait_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        disconnected = asyncio.ensure_future(wait_disconnect())
+        stopping = asyncio.ensure_future(self.stopping.wait())
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ] + CORS_HEADERS,
+            })
+            await chunk(f'retry: {Config.EVENTS_RETRY_MS}\n\n')
+
+            if last_id is not None:
+                missed = broker.replay(last_id)
+                if missed is None:
+                    await chunk('event: resync\ndata: {}\n\n')
+                else:
+                    for message in missed:
+                        await chunk(format_event(message))
+
+            while not (disconnected.done() or stopping.done()):
+                if subscriber.lagged:
+                    subscriber.lagged = False
+                    await chunk('event: resync\ndata: {}\n\n')
+
+                getter = asyncio.ensure_future(subscriber.queue.get())
+                await asyncio.wait({getter, disconnected, stopping},
+                                   timeout=Config.EVENTS_HEARTBEAT,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    await chunk(format_event(getter.result()))
+                else:
+                    getter.cancel()
+                    if not (disconnected.done() or stopping.done()):
+                        await chunk(': ping\n\n')
+        except OSError:
+            pass  # client went away mid-write
+        except asyncio.CancelledError:
+            # uvicorn only runs lifespan shutdown once connections are gone, so an
+            # open stream is cancelled when its graceful-shutdown timeout expires
+            pass
+        finally:
+            broker.unsubscribe(subscriber)
+            disconnected.cancel()
+            stopping.cancel()
+            try:
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            except Exception:  # the server may already have dropped the connection
+                pass
@@ -0,0 +1,56 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .models import connect
+
+
+class AsyncDB:
+    """
+    Non-blocking SQLite access for async code (the ASGI server in app/asgi.py).
+
+    Logic: the event loop never touches SQLite itself -> every query runs on a
+    small, bounded pool of threads -> each thread keeps its own connection
+    (opened once with our usual pragmas) -> the coroutine awaits the result.
+    At most `threads` queries run at once; the rest wait in line instead of
+    piling up more connections.
+    """
+
+    def __init__(self, threads=4):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asyncdb')
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect()
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _call(self, fn, args):
+        conn = self._conn()
+        try:
+            return fn(conn, *args)
+        finally:
+            # Leave the connection clean for the next query on this thread
+            if conn.in_transaction:
+                conn.rollback()
+
+    async def run(self, fn, *args):
+        """Run fn(conn, *args) on the pool, e.g. await db.run(read_stats)."""
+        loop = asyncio.get_running_loop()
+        # Like asyncio.to_thread: the query sees the caller's context (request metrics)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, context.run, self._call, fn, args)
+
+    def close(self):
+        """Wait for running queries, then close every thread's connection."""
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import g, request, make_response
+from config import Config
+from .models import get_db, table_versions
+
+
+# --- BACKENDS ---
+# A backend is anything with get(key) and set(key, value, ttl).
+# Values are plain bytes so the same cache entries work in memory or in Redis.
+
+class MemoryBackend:
+    """In-process LRU with a per-entry TTL. One copy per worker process."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)  # mark as recently used
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            # Evict the least recently used entries once we are over the limit
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class RedisBackend:
+    """Shared cache for several gunicorn workers. Needs the optional 'redis' package."""
+
+    def __init__(self, url):
+        import redis  # only imported when this backend is actually chosen
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=ttl)
+
+
+# --- RESPONSE CACHE ---
+
+class ResponseCache:
+    """
+    Caches full GET responses.
+
+    The key is the URL plus the table_versions counter of every table the
+    response reads. Those counters are bumped by triggers inside the writing
+    transaction, so any write (this worker, another worker, seed.py, the
+    Todoist sync process) moves later requests to a new key; old entries
+    just age out through LRU/TTL. Nothing has to be invalidated by hand.
+    """
+
+    def __init__(self, backend=None, ttl=60):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def key(self, tables):
+        """
+        Logic: URL (path + query string) + today's date + version of every table it reads.
+        Same inputs as the ETag (see validators), so a body is never served
+        under the ETag of another version.
+        """
+        versions = request_versions(tables)
+        marks = '.'.join(f'{t}{versions.get(t, (0, 0))[0]}' for t in tables)
+        return f'resp:{request.full_path}|{_utc_today()}|{marks}'
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+cache = ResponseCache()
+
+
+def _utc_today():
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def request_versions(tables):
+    """
+    table_versions for this request, read once: @conditional (ETag) and
+    @cached (cache key) must agree on the same numbers.
+    """
+    memo = g.setdefault('table_versions', {})
+    if tables not in memo:
+        memo[tables] = table_versions(get_db(), tables)
+    return memo[tables]
+
+
+# Entry format: one JSON line (status + headers), then the raw body bytes.
+# Plain data only: whoever can write to a shared Redis can't run code in our workers.
+
+def _dump_entry(body, status, headers):
+    meta = json.dumps({'status': status, 'headers': headers})  # ASCII, so no raw newline
+    return meta.encode() + b'\n' + body
+
+
+def _load_entry(entry):
+    """Returns (body, status, headers), or None for anything we did not write."""
+    meta, _, body = entry.partition(b'\n')
+    try:
+        meta = json.loads(meta)
+        return body, int(meta['status']), [(str(k), str(v)) for k, v in meta['headers']]
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def cached(*tables):
+    """Decorator for GET views: serve from cache until one of `tables` changes."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not cache.enabled:
+                return view(*args, **kwargs)
+
+            key = cache.key(tables)
+            entry = cache.backend.get(key)
+            entry = _load_entry(entry) if entry is not None else None
+            if entry is not None:
+                cache._count('hits')
+                body, status, headers = entry
+                response = make_response(body, status, headers)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            cache._count('misses')
+            response = make_response(view(*args, **kwargs))
+            # Only cache complete, successful bodies (never ?stream=1 generators)
+            if response.status_code == 200 and not response.is_streamed:
+                headers = [(k, v) for k, v in response.headers if k.lower() != 'content-length']
+                entry = _dump_entry(response.get_data(), response.status_code, headers)
+                cache.backend.set(key, entry, cache.ttl)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+# --- HTTP VALIDATORS (ETag / Last-Modified) ---
+
+def validators(full_path, versions, tables):
+    """
+    Logic: URL + today's date + table versions -> (etag, last_modified).
+    full_path is path + '?' + query string, like Flask's request.full_path.
+    """
+    now = datetime.now(timezone.utc)
+    midnight = int(now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+    # Different URLs (filters, pages, ?fields=) are different representations
+    fingerprint = '|'.join(
+        [full_path, now.date().isoformat()]
+        + [f'{t}:{versions.get(t, (0, 0))[0]}' for t in tables]
+    )
+    etag = hashlib.sha1(fingerprint.encode()).hexdigest()[:20]
+    last_modified = datetime.fromtimestamp(
+        max([midnight] + [updated for _, updated in versions.values()]), timezone.utc
+    )
+    return etag, last_modified
+
+
+def is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+    """If-None-Match wins over If-Modified-Since (RFC 9110)."""
+    if if_none_match:
+        return if_none_match.contains_weak(etag)
+    if if_modified_since:
+        return last_modified <= if_modified_since
+    return False
+
+
+def conditional(*tables):
+    """
+    Decorator for GET views: answer 304 Not Modified when the client already has
+    the current version, without running the view (so no tasks rows are read).
+
+    The validators come from the table_versions change counters that the
+    triggers in init_db() bump on every write. Today's date is mixed in as well
+    because views like /tasks/overdue change at midnight without any write.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = request_versions(tables)
+            etag, last_modified = validators(request.full_path, versions, tables)
+
+            if is_not_modified(etag, last_modified, request.if_none_match, request.if_modified_since):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            # Let browsers keep the body but always ask us first
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Pick the backend from Config (memory by default, redis if CACHE_REDIS_URL is set)."""
+    cache.enabled = Config.CACHE_ENABLED
+    cache.ttl = Config.CACHE_TTL
+    if Config.CACHE_REDIS_URL:
+        cache.backend = RedisBackend(Config.CACHE_REDIS_URL)
+    else:
+        cache.backend = MemoryBackend(Config.CACHE_MAX_ENTRIES)
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import queue
+import secrets
+import threading
+from collections import deque
+
+from flask import Response, request
+from config import Config
+from .models import TASK_COLUMNS, ROOMMATE_COLUMNS
+
+# Columns sent in a row diff, per resource
+EVENT_COLUMNS = {
+    'tasks': TASK_COLUMNS,
+    'roommates': ROOMMATE_COLUMNS,
+}
+
+
+class Subscriber:
+    """One open /events connection: its own queue + a flag if it fell behind."""
+
+    def __init__(self, size):
+        self.queue = queue.Queue(maxsize=size)
+        self.lagged = False
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # Slow client: stop queueing, it will be told to reload everything
+            self.lagged = True
+
+
+class AsyncSubscriber(Subscriber):
+    """Same thing for the ASGI server: an asyncio queue fed from any thread."""
+
+    def __init__(self, size, loop):
+        self.queue = asyncio.Queue(maxsize=size)
+        self.lagged = False
+        self.loop = loop
+
+    def deliver(self, message):
+        # publish() runs in worker threads; only the event loop may touch the queue
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe for live updates.
+
+    Logic: write handler publishes a small diff -> every open /events stream
+    gets a copy. The last few events are kept so a client that reconnects
+    (EventSource sends Last-Event-ID) can catch up without a full reload.
+    """
+
+    def __init__(self, buffer_size=500, queue_size=256):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._recent = deque(maxlen=buffer_size)  # (seq, (id, event, data))
+        self._next_id = 1
+        # Event ids are "<epoch>-<seq>": after a restart (or on another worker)
+        # a client's Last-Event-ID never matches and it is told to resync
+        self.epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+
+    def subscribe(self, loop=None):
+        """Pass the running event loop to get an AsyncSubscriber (ASGI mode)."""
+        subscriber = AsyncSubscriber(self.queue_size, loop) if loop else Subscriber(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        with self._lock:
+            seq = self._next_id
+            message = (f'{self.epoch}-{seq}', event, json.dumps(data))
+            self._next_id += 1
+            self._recent.append((seq, message))
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            subscriber.deliver(message)
+
+    def replay(self, last_event_id):
+        """
+        Events after the Last-Event-ID a client sent, or None when we can't tell
+        what it missed (id from another process / before a restart, or already
+        fell out of the buffer).
+        """
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._lock:
+            if not self._recent or seq >= self._recent[-1][0]:
+                return []
+            if seq < self._recent[0][0] - 1:
+                return None
+            return [message for s, message in self._recent if s > seq]
+
+
+broker = EventBroker(Config.EVENTS_BUFFER_SIZE, Config.EVENTS_QUEUE_SIZE)
+
+
+# --- PUBLISHING ROW DIFFS ---
+# Diffs are published after commit, so two writers can publish in the opposite
+# order of their commits. Every diff carries the table_versions number of its
+# resource (bumped by the triggers in the writing transaction): a client ignores
+# a row diff older than the last one it applied for that id.
+
+def _version(conn, resource):
+    row = conn.execute('SELECT version FROM table_versions WHERE name = ?', (resource,)).fetchone()
+    return row['version'] if row else 0
+
+
+def publish_upsert(conn, resource, ids):
+    """Re-read the changed rows (after commit) and send them as one event."""
+    ids = [i for i in ids if i is not None]
+    if not ids:
+        return
+    columns = EVENT_COLUMNS[resource]
+    # Rows and version from one read snapshot
+    conn.execute('BEGIN')
+    try:
+        version = _version(conn, resource)
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM {resource} WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(ids),),
+        ).fetchall()
+    finally:
+        conn.rollback()
+    if rows:
+        broker.publish(resource, {'action': 'upsert', 'version': version,
+                                  'rows': [dict(row) for row in rows]})
+
+
+def publish_delete(conn, resource, ids):
+    """Call after commit: the version read here is at least the delete's own."""
+    ids = [i for i in ids if i is not None]
+    if ids:
+        broker.publish(resource, {'action': 'delete', 'version': _version(conn, resource), 'ids': ids})
+
+
+# --- SERVER-SENT EVENTS STREAM ---
+
+def format_event(message):
+    event_id, event, data = message
+    return f'id: {event_id}\nevent: {event}\ndata: {data}\n\n'
+
+
+def event_stream():
+    """
+    GET /events body. Deliberately does not hold a database connection:
+    a stream can stay open for hours.
+    """
+    last_id = request.headers.get('Last-Event-ID')
+    subscriber = broker.subscribe()
+
+    def generate():
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield f'retry: {Config.EVENTS_RETRY_MS}\n\n'
+
+            if last_id is not None:
+                missed = broker.replay(last_id)
+                if missed is None:
+                    yield 'event: resync\ndata: {}\n\n'
+                else:
+                    for message in missed:
+                        yield format_event(message)
+
+            while True:
+                if subscriber.lagged:
+                    # We dropped events for this client: ask it to reload once
+                    subscriber.lagged = False
+                    yield 'event: resync\ndata: {}\n\n'
+                try:
+                    message = subscriber.queue.get(timeout=Config.EVENTS_HEARTBEAT)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': ping\n\n'
+                    continue
+                yield format_event(message)
+        finally:
+            broker.unsubscribe(subscriber)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: do not buffer the stream
+    return response
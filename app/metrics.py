@@ -0,0 +1,312 @@
+"""
+Opt-in request instrumentation (DORMMATE_METRICS=1).
+
+Per request we record:
+- latency, per endpoint
+- how many SQL statements ran (sqlite3 trace callback) and the time spent in them
+- response size
+
+Everything is exposed on GET /metrics in Prometheus text format.
+With DORMMATE_PROFILE_RATE > 0 a sample of requests also runs under cProfile,
+and the slowest ones are dumped as .prof files (open with snakeviz,
+or turn into a flamegraph with flameprof / gprof2dot).
+Numbers are per worker process. Under asgi.py the natively served routes
+(app/asgi.py) report the same series through observe_request(); they are
+not sampled by the profiler.
+"""
+import cProfile
+import contextlib
+import contextvars
+import heapq
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from flask import Response, g, has_app_context, request
+from config import Config
+from . import models
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+# --- SQL ACCOUNTING ---
+
+# Set while an app/asgi.py request runs; AsyncDB carries it into its query threads
+_current_stats = contextvars.ContextVar('dormmate_sql_stats', default=None)
+
+
+class SQLStats:
+    """Per-request counters for code running outside a Flask request (app/asgi.py)."""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+
+@contextlib.contextmanager
+def collect_sql(stats):
+    """Count the statements run inside the block (and its AsyncDB queries) into stats."""
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _sql_stats():
+    """The current request's counters, or None outside a request (background threads)."""
+    if has_app_context() and 'sql_count' in g:
+        return g
+    return _current_stats.get()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Adds the time spent executing and fetching to the current request."""
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            stats = _sql_stats()
+            if stats is not None:
+                stats.sql_time += time.perf_counter() - start
+
+    def execute(self, *args):
+        return self._timed(super().execute, *args)
+
+    def executemany(self, *args):
+        return self._timed(super().executemany, *args)
+
+    def fetchone(self):
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed(super().fetchall)
+
+    def __next__(self):
+        return self._timed(super().__next__)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection factory used by models.connect() while metrics are on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(_count_statement)
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # The C versions of these skip our cursor class, so route them through it
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+
+def _count_statement(sql):
+    stats = _sql_stats()
+    # Statements run by triggers are reported as "-- TRIGGER ..." comments
+    if stats is not None and not sql.startswith('--'):
+        stats.sql_count += 1
+
+
+# --- METRICS REGISTRY ---
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """name -> {labels tuple -> Histogram}, plus a request counter."""
+
+    HISTOGRAMS = {
+        'dormmate_request_duration_seconds': ('Request latency per endpoint', LATENCY_BUCKETS),
+        'dormmate_request_sql_statements': ('SQL statements executed per request', COUNT_BUCKETS),
+        'dormmate_request_sql_seconds': ('Time spent in SQLite per request', LATENCY_BUCKETS),
+        'dormmate_response_size_bytes': ('Response body size', SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {name: {} for name in self.HISTOGRAMS}
+        self.requests = {}  # (endpoint, method, status) -> count
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            series = self.histograms[name]
+            if labels not in series:
+                series[labels] = Histogram(self.HISTOGRAMS[name][1])
+            series[labels].observe(value)
+
+    def count_request(self, labels):
+        with self._lock:
+            self.requests[labels] = self.requests.get(labels, 0) + 1
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            '# HELP dormmate_requests_total Requests handled',
+            '# TYPE dormmate_requests_total counter',
+        ]
+        with self._lock:
+            for (endpoint, method, status), value in sorted(self.requests.items()):
+                lines.append(f'dormmate_requests_total{{endpoint="{endpoint}",method="{method}",'
+                             f'status="{status}"}} {value}')
+
+            for name, (help_text, buckets) in self.HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (endpoint, method), hist in sorted(self.histograms[name].items()):
+                    labels = f'endpoint="{endpoint}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(list(buckets) + ['+Inf'], hist.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{{labels}}} {hist.sum:.6f}')
+                    lines.append(f'{name}_count{{{labels}}} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+# --- SAMPLING PROFILER ---
+
+class SlowestProfiles:
+    """Keeps the `keep` slowest profiled requests on disk, deletes the rest."""
+
+    def __init__(self, directory, keep):
+        self.directory = directory
+        self.keep = keep
+        self._heap = []  # (duration, path) min-heap
+        self._lock = threading.Lock()
+
+    def offer(self, profiler, duration, endpoint):
+        with self._lock:
+            if len(self._heap) >= self.keep and duration <= self._heap[0][0]:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            safe = endpoint.strip('/').replace('/', '_').replace('<', '').replace('>', '') or 'root'
+            path = os.path.join(self.directory, f'{duration * 1000:08.1f}ms_{safe}_{time.time_ns()}.prof')
+            profiler.dump_stats(path)
+            heapq.heappush(self._heap, (duration, path))
+            if len(self._heap) > self.keep:
+                _, dropped = heapq.heappop(self._heap)
+                try:
+                    os.remove(dropped)
+                except OSError:
+                    pass
+
+
+profiles = SlowestProfiles(Config.PROFILE_DIR, Config.PROFILE_KEEP)
+
+# Only one profiler can be active per process (Python 3.12+ raises on a second
+# enable()), so overlapping sampled requests are simply not profiled.
+_profile_lock = threading.Lock()
+
+
+def _start_profiler():
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiling tool is active (debugger, coverage...)
+        _profile_lock.release()
+        return None
+    return profiler
+
+
+def _stop_profiler():
+    """Disable the current request's profiler (if any) and hand the slot back."""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+    return profiler
+
+
+def observe_request(endpoint, method, status, duration, sql_count, sql_time, size=None):
+    """Record one finished request in every series."""
+    labels = (endpoint, method)
+    registry.count_request((endpoint, method, status))
+    registry.observe('dormmate_request_duration_seconds', labels, duration)
+    registry.observe('dormmate_request_sql_statements', labels, sql_count)
+    registry.observe('dormmate_request_sql_seconds', labels, sql_time)
+    # Streamed bodies have no length yet; they are left out of the size histogram
+    if size is not None:
+        registry.observe('dormmate_response_size_bytes', labels, size)
+
+
+# --- FLASK HOOKS ---
+
+def _before_request():
+    g.request_start = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+    if Config.PROFILE_RATE and random.random() < Config.PROFILE_RATE:
+        profiler = _start_profiler()
+        if profiler is not None:
+            g.profiler = profiler
+
+
+def _after_request(response):
+    if 'request_start' not in g:
+        return response
+    duration = time.perf_counter() - g.request_start
+
+    profiler = _stop_profiler()
+
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    observe_request(endpoint, request.method, response.status_code, duration,
+                    g.sql_count, g.sql_time, response.content_length)
+
+    if profiler is not None:
+        profiles.offer(profiler, duration, endpoint)
+    return response
+
+
+def _teardown_request(exc):
+    # after_request is skipped when a view raises: never leave the profiler running
+    _stop_profiler()
+
+
+def metrics_view():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """Turn instrumentation on (only when METRICS_ENABLED) and add GET /metrics."""
+    if not Config.METRICS_ENABLED:
+        return
+    # New pooled connections report their statements and timings
+    models.connection_factory = InstrumentedConnection
+    models.close_pool()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -1,17 +1,454 @@
+import json
+import queue
+import re
 import sqlite3
+from flask import g, has_app_context
 from config import Config
 
 # Path where our .db file will be stored
 db_path = Config.DATABASE_PATH
 
-def get_db():
-    """Logic: Open connection -> enable dictionary-like rows -> return connection"""
-    conn = sqlite3.connect(db_path)
+# Idle connections waiting to be reused by the next request.
+# LIFO so the most recently used (warmest cache) connection goes out first.
+_pool = queue.LifoQueue(maxsize=Config.DB_POOL_SIZE)
+
+# Class used for new connections (app/metrics.py swaps in an instrumented one)
+connection_factory = sqlite3.Connection
+
+
+# Columns the API is allowed to project with ?fields=
+# (also keeps user input out of the SQL we build)
+TASK_COLUMNS = ('id', 'title', 'description', 'roommate_id', 'room_id',
+                'due_date', 'priority', 'status', 'completed_at')
+ROOMMATE_COLUMNS = ('id', 'name', 'email')
+
+# Tables whose changes are counted in table_versions (see MIGRATIONS)
+VERSIONED_TABLES = ('tasks', 'roommates', 'rooms')
+
+
+def connect():
+    """Logic: Open connection -> enable dictionary-like rows -> apply pragmas -> return connection"""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=Config.DB_BUSY_TIMEOUT / 1000,
+        cached_statements=Config.DB_STATEMENT_CACHE,  # keeps prepared statements compiled
+        check_same_thread=False,  # pooled connections move between worker threads
+        factory=connection_factory,
+    )
     conn.row_factory = sqlite3.Row  # Crucial for returning data as dicts in API
+
+    # WAL lets readers keep going while one writer commits,
+    # so concurrent requests stop failing with "database is locked".
+    conn.execute('PRAGMA journal_mode = WAL')
+    # NORMAL is safe with WAL and skips an fsync on every commit.
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {int(Config.DB_BUSY_TIMEOUT)}')
+    conn.execute(f'PRAGMA cache_size = {int(Config.DB_CACHE_SIZE)}')
+    conn.execute(f'PRAGMA mmap_size = {int(Config.DB_MMAP_SIZE)}')
+    conn.execute('PRAGMA temp_store = MEMORY')
     return conn
 
+
+def _checkout():
+    """Take an idle connection from the pool, or open a new one if it is empty."""
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return connect()
+
+
+def _release(conn):
+    """Give a connection back to the pool (or close it if the pool is already full)."""
+    # Never hand a half-finished transaction to the next request
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def get_db():
+    """
+    Logic: Inside a request -> reuse the connection of this app context.
+    Outside a request (scripts like seed.py) -> plain connection the caller closes.
+    """
+    if not has_app_context():
+        return connect()
+
+    if 'db' not in g:
+        g.db = _checkout()
+    return g.db
+
+
+def release_db(exc=None):
+    """Teardown hook: return this app context's connection to the pool."""
+    conn = g.pop('db', None)
+    if conn is not None:
+        _release(conn)
+
+
+def close_pool():
+    """Close every idle pooled connection (used on shutdown or after switching db_path)."""
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+def init_app(app):
+    """Hook the connection pool into the Flask app lifecycle."""
+    app.teardown_appcontext(release_db)
+
+# --- DASHBOARD AGGREGATES (GET /stats) ---
+# task_counts: open/done tasks overall, per roommate and per room (key 0 = unassigned).
+# task_day_counts: open tasks per due date ('due') and completions per day ('done'),
+# so overdue / upcoming / completed-this-week are sums over a few day rows.
+# Triggers keep both in step with every write; REBUILD_STATS_SQL recomputes them.
+
+def _stats_delta(row, sign):
+    """Trigger statements adding (sign=+1) or removing (sign=-1) one task row."""
+    is_done = f"{sign} * ({row}.status IS 'done')"
+    is_open = f"{sign} * ({row}.status IS NOT 'done')"
+    return [
+        f"""
+        INSERT INTO task_counts (scope, key, open_count, done_count)
+        VALUES ('all', 0, {is_open}, {is_done}),
+               ('roommate', COALESCE({row}.roommate_id, 0), {is_open}, {is_done}),
+               ('room', COALESCE({row}.room_id, 0), {is_open}, {is_done})
+        ON CONFLICT(scope, key) DO UPDATE SET
+            open_count = open_count + excluded.open_count,
+            done_count = done_count + excluded.done_count;
+        """,
+        f"""
+        INSERT INTO task_day_counts (kind, day, count)
+        SELECT 'due', {row}.due_date, {sign}
+        WHERE {row}.status IS NOT 'done' AND {row}.due_date IS NOT NULL
+        ON CONFLICT(kind, day) DO UPDATE SET count = count + excluded.count;
+        """,
+        f"""
+        INSERT INTO task_day_counts (kind, day, count)
+        SELECT 'done', DATE({row}.completed_at), {sign}
+        WHERE {row}.status IS 'done' AND {row}.completed_at IS NOT NULL
+        ON CONFLICT(kind, day) DO UPDATE SET count = count + excluded.count;
+        """,
+    ]
+
+
+def _stats_trigger(name, event, statements):
+    body = ''.join(statements)
+    return f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON tasks BEGIN {body} END"
+
+
+REBUILD_STATS_SQL = [
+    "DELETE FROM task_counts",
+    "DELETE FROM task_day_counts",
+    """
+    INSERT INTO task_counts (scope, key, open_count, done_count)
+    SELECT 'all', 0, COALESCE(SUM(status IS NOT 'done'), 0), COALESCE(SUM(status IS 'done'), 0) FROM tasks
+    UNION ALL
+    SELECT 'roommate', COALESCE(roommate_id, 0), SUM(status IS NOT 'done'), SUM(status IS 'done')
+    FROM tasks GROUP BY COALESCE(roommate_id, 0)
+    UNION ALL
+    SELECT 'room', COALESCE(room_id, 0), SUM(status IS NOT 'done'), SUM(status IS 'done')
+    FROM tasks GROUP BY COALESCE(room_id, 0)
+    """,
+    """
+    INSERT INTO task_day_counts (kind, day, count)
+    SELECT 'due', due_date, COUNT(*) FROM tasks
+    WHERE status IS NOT 'done' AND due_date IS NOT NULL GROUP BY due_date
+    UNION ALL
+    SELECT 'done', DATE(completed_at), COUNT(*) FROM tasks
+    WHERE status IS 'done' AND completed_at IS NOT NULL GROUP BY DATE(completed_at)
+    """,
+]
+
+
+# Schema changes applied on top of the base tables, oldest first.
+# PRAGMA user_version remembers how many already ran, so each one runs exactly once.
+# Never edit an entry that has shipped: append a new one instead.
+MIGRATIONS = [
+    # 1. Indexes for the dashboard views, so they stop scanning the whole tasks table.
+    [
+        # upcoming + overdue: range on due_date over tasks that are not done yet
+        "CREATE INDEX IF NOT EXISTS idx_tasks_open_due ON tasks(due_date) WHERE status != 'done'",
+        # completed this week: range on completed_at over finished tasks only
+        "CREATE INDEX IF NOT EXISTS idx_tasks_done_completed ON tasks(completed_at) WHERE status = 'done'",
+        # joins / lookups by owner and location (also used when a roommate moves out)
+        "CREATE INDEX IF NOT EXISTS idx_tasks_roommate ON tasks(roommate_id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_room ON tasks(room_id)",
+    ],
+    # 2. Change counter per table (drives ETag / Last-Modified on the GET routes).
+    #    Triggers keep it up to date, so every writer (routes, scripts, sync) is covered.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))  -- unix seconds
+        )
+        """,
+        "INSERT OR IGNORE INTO table_versions (name) VALUES ('tasks'), ('roommates'), ('rooms')",
+    ] + [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+        AFTER {event} ON {table}
+        BEGIN
+            UPDATE table_versions
+            SET version = version + 1, updated_at = strftime('%s', 'now')
+            WHERE name = '{table}';
+        END
+        """
+        for table in VERSIONED_TABLES
+        for event in ('INSERT', 'UPDATE', 'DELETE')
+    ],
+    # 3. Reminder bookkeeping (app/reminders.py).
+    #    reminder_log: one row per task + due date that was emailed, so restarts never resend.
+    #    scheduler_state: small key/value store for background jobs (e.g. the Todoist sync token).
+    [
+        """
+        CREATE TABLE IF NOT EXISTS reminder_log (
+            task_id INTEGER NOT NULL,
+            due_date TEXT NOT NULL,
+            roommate_id INTEGER,
+            sent_at TEXT NOT NULL,
+            PRIMARY KEY (task_id, due_date)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS scheduler_state (
+            name TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """,
+    ],
+    # 4. Link tasks imported from Todoist (app/todoist_api.py) so a sync updates them in place
+    [
+        "ALTER TABLE tasks ADD COLUMN todoist_id TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_todoist ON tasks(todoist_id) WHERE todoist_id IS NOT NULL",
+    ],
+    # 5. Incrementally maintained dashboard aggregates (see DASHBOARD AGGREGATES above)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS task_counts (
+            scope TEXT NOT NULL,   -- 'all', 'roommate' or 'room'
+            key INTEGER NOT NULL,  -- roommate / room id, 0 = unassigned (or 'all')
+            open_count INTEGER NOT NULL DEFAULT 0,
+            done_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS task_day_counts (
+            kind TEXT NOT NULL,    -- 'due' (open tasks by due date) or 'done' (completions by day)
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, day)
+        ) WITHOUT ROWID
+        """,
+        _stats_trigger('trg_task_stats_insert', 'INSERT', _stats_delta('NEW', 1)),
+        _stats_trigger('trg_task_stats_delete', 'DELETE', _stats_delta('OLD', -1)),
+        _stats_trigger('trg_task_stats_update',
+                       'UPDATE OF status, roommate_id, room_id, due_date, completed_at',
+                       _stats_delta('OLD', -1) + _stats_delta('NEW', 1)),
+    ] + REBUILD_STATS_SQL,  # fill them from the tasks that already exist
+    # 6. Spatial index on the room map (GET /rooms viewport queries).
+    #    Each room is a zero-size box at (pos_x, pos_y); triggers keep it in step with rooms.
+    [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS rooms_rtree USING rtree(id, min_x, max_x, min_y, max_y)",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_rooms_rtree_insert
+        AFTER INSERT ON rooms
+        BEGIN
+            INSERT OR REPLACE INTO rooms_rtree VALUES (NEW.id, NEW.pos_x, NEW.pos_x, NEW.pos_y, NEW.pos_y);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_rooms_rtree_update
+        AFTER UPDATE OF id, pos_x, pos_y ON rooms
+        BEGIN
+            DELETE FROM rooms_rtree WHERE id = OLD.id;
+            INSERT OR REPLACE INTO rooms_rtree VALUES (NEW.id, NEW.pos_x, NEW.pos_x, NEW.pos_y, NEW.pos_y);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_rooms_rtree_delete
+        AFTER DELETE ON rooms
+        BEGIN
+            DELETE FROM rooms_rtree WHERE id = OLD.id;
+        END
+        """,
+        # rooms that already exist
+        "INSERT OR REPLACE INTO rooms_rtree SELECT id, pos_x, pos_x, pos_y, pos_y FROM rooms",
+    ],
+]
+
+
+def migrate(conn):
+    """
+    Logic: take the write lock -> read user_version -> run the next migration
+    -> bump user_version -> commit -> repeat. Several worker processes can
+    start at once: the one holding the lock migrates, the others re-read the
+    version afterwards and find nothing left to do.
+    """
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= len(MIGRATIONS):
+            conn.rollback()
+            return len(MIGRATIONS)
+        for statement in MIGRATIONS[version]:
+            conn.execute(statement)
+        # PRAGMA does not accept ? placeholders; the version is our own int
+        conn.execute(f'PRAGMA user_version = {version + 1}')
+        conn.commit()
+
+
+def table_versions(conn, tables):
+    """Logic: one tiny lookup -> {table: (version, updated_at unix seconds)}"""
+    marks = ','.join('?' * len(tables))
+    rows = conn.execute(
+        f'SELECT name, version, updated_at FROM table_versions WHERE name IN ({marks})',
+        tables,
+    ).fetchall()
+    return {row['name']: (row['version'], row['updated_at']) for row in rows}
+
+
+# --- BULK TASK WRITES ---
+# Shared by the /tasks routes and seed.py. Each function only prepares the
+# statements; the caller decides when to commit, so a whole batch is one
+# transaction (one fsync) instead of one per task.
+
+def _as_id(value):
+    """Task ids must be plain integers (anything else is reported as not found)."""
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _bad_text(data, fields):
+    """Name of the first field that is set but not a string (SQLite can't bind lists / objects)."""
+    for field in fields:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return field
+    return None
+
+
+def valid_email(value):
+    """One address, no whitespace: a CR/LF would make the reminder email headers fail."""
+    return isinstance(value, str) and re.fullmatch(r'[^@\s]+@[^@\s]+\.[^@\s]+', value) is not None
+
+
+def _as_ref(value):
+    """
+    roommate_id / room_id: int, numeric string (HTML form values) or empty -> int or None.
+    Raises ValueError for anything else.
+    """
+    if value is None or value == '' or value == 0:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    raise ValueError(value)
+
+
+def _existing_task_ids(conn, ids):
+    """Which of these ids are real tasks? (json_each avoids the ? variable limit)"""
+    rows = conn.execute(
+        'SELECT id FROM tasks WHERE id IN (SELECT value FROM json_each(?))',
+        (json.dumps(ids),),
+    ).fetchall()
+    return {row['id'] for row in rows}
+
+
+def insert_tasks(conn, items):
+    """
+    Logic: validate every item -> one executemany for the valid ones -> per-item results.
+    Results look like {"index": 0, "id": 12} or {"index": 1, "error": "..."}.
+    """
+    results = [None] * len(items)
+    rows = []
+    for index, data in enumerate(items):
+        if not isinstance(data, dict) or not data.get('title'):
+            results[index] = {'index': index, 'error': 'title is required'}
+            continue
+        bad = _bad_text(data, ('title', 'description', 'due_date', 'priority'))
+        if bad:
+            results[index] = {'index': index, 'error': f'{bad} must be a string'}
+            continue
+        try:
+            roommate_id = _as_ref(data.get('roommate_id'))
+            room_id = _as_ref(data.get('room_id'))
+        except ValueError:
+            results[index] = {'index': index, 'error': 'roommate_id and room_id must be integers'}
+            continue
+        rows.append((index, (
+            data.get('title'),
+            data.get('description'),
+            roommate_id,
+            room_id,
+            data.get('due_date'),
+            data.get('priority') or 'Low',
+            'Pending',  # Default status for new tasks
+        )))
+
+    if rows:
+        conn.executemany('''
+            INSERT INTO tasks (title, description, roommate_id, room_id, due_date, priority, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [values for _, values in rows])
+        # We still hold the write lock, so the new ids are the last len(rows) of the sequence
+        last_id = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()[0]
+        first_id = last_id - len(rows) + 1
+        for offset, (index, _) in enumerate(rows):
+            results[index] = {'index': index, 'id': first_id + offset}
+
+    return results
+
+
+def update_task_statuses(conn, items):
+    """
+    Logic: items are {"id": 3, "status": "done"} -> one executemany -> per-item results.
+    Marking 'done' stamps completed_at, any other status clears it.
+    """
+    ids = [_as_id(item.get('id')) for item in items if isinstance(item, dict)]
+    existing = _existing_task_ids(conn, ids)
+
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('status'):
+            results.append({'index': index, 'error': 'id and status are required'})
+        elif not isinstance(item['status'], str):
+            results.append({'index': index, 'id': item.get('id'), 'error': 'status must be a string'})
+        elif _as_id(item.get('id')) not in existing:
+            results.append({'index': index, 'id': item.get('id'), 'error': 'task not found'})
+        else:
+            rows.append((item['status'], item['status'], item['id']))
+            results.append({'index': index, 'id': item['id']})
+
+    conn.executemany('''
+        UPDATE tasks
+        SET status = ?,
+            completed_at = CASE WHEN ? = 'done' THEN DATETIME('now') ELSE NULL END
+        WHERE id = ?
+    ''', rows)
+    return results
+
+
+def delete_tasks(conn, ids):
+    """Logic: find which ids exist -> one executemany DELETE -> per-item results."""
+    existing = _existing_task_ids(conn, [_as_id(i) for i in ids])
+    conn.executemany('DELETE FROM tasks WHERE id = ?', [(i,) for i in existing])
+    return [
+        {'index': index, 'id': task_id} if _as_id(task_id) in existing
+        else {'index': index, 'id': task_id, 'error': 'task not found'}
+        for index, task_id in enumerate(ids)
+    ]
+
+
 def init_db():
-    conn = get_db()
+    conn = connect()
     cur = conn.cursor()
 
     # 1. ROOMMATES TABLE
@@ -55,5 +492,9 @@ def init_db():
     ''')
 
     conn.commit()
+
+    # 4. Indexes and later schema changes
+    migrate(conn)
+
     conn.close()
     print("Database initialized with Rooms and Email support.")
\ No newline at end of file
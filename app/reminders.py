@@ -0,0 +1,325 @@
+"""
+Automatic email reminders for overdue tasks.
+
+Logic: every few minutes -> find overdue tasks nobody was reminded about yet
+(anti-join with reminder_log over the open-tasks index) -> group them per roommate ->
+claim the tasks in reminder_log -> send one email per roommate through a
+rate-limited, retrying sender. Claiming first means two scanners (one per worker)
+never both send, and a restart never sends twice; a failed send gives its claim back.
+
+Run one scan by hand, or keep scanning in a dedicated process:
+    python -m app.reminders
+    python -m app.reminders --loop
+"""
+import queue
+import smtplib
+import sys
+import time
+from datetime import date
+from email.message import EmailMessage
+
+from config import Config
+from .models import connect
+from .workers import IntervalWorker, WorkerSlot
+
+
+# --- SENDERS ---
+# A sender is anything with send(to, subject, body). It raises on failure.
+
+class LocalSender:
+    """Stand-in that keeps messages in memory (tests, local development)."""
+
+    def __init__(self, echo=False):
+        self.outbox = []
+        self.echo = echo
+
+    def send(self, to, subject, body):
+        self.outbox.append({'to': to, 'subject': subject, 'body': body})
+        if self.echo:
+            print(f"[reminder] to={to} subject={subject!r}")
+
+
+class SMTPSender:
+    """
+    Sends through an SMTP server, reusing open connections.
+    Logging in (and STARTTLS) costs several round-trips, so we keep
+    up to `pool_size` authenticated connections around instead.
+    """
+
+    def __init__(self, host, port=587, username=None, password=None,
+                 use_tls=True, sender=None, pool_size=2, timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.sender = sender or username
+        if not self.sender:
+            raise ValueError('SMTP_FROM (or SMTP_USERNAME) must be set to send reminders')
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def _checkout(self):
+        try:
+            smtp = self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+        # The server may have dropped an idle connection
+        try:
+            if smtp.noop()[0] == 250:
+                return smtp
+        except smtplib.SMTPException:
+            pass
+        return self._connect()
+
+    def _release(self, smtp):
+        try:
+            self._pool.put_nowait(smtp)
+        except queue.Full:
+            smtp.quit()
+
+    def send(self, to, subject, body):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = to
+        message['Subject'] = subject
+        message.set_content(body)
+
+        smtp = self._checkout()
+        try:
+            smtp.send_message(message)
+        except Exception:
+            # Never put a connection in an unknown state back into the pool
+            smtp.close()
+            raise
+        self._release(smtp)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().quit()
+            except queue.Empty:
+                break
+            except smtplib.SMTPException:
+                pass
+
+
+# --- RATE LIMIT + RETRY ---
+
+class RateLimiter:
+    """Token bucket: at most `rate` sends per second, bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+
+    def acquire(self):
+        while True:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            self.sleep((1 - self.tokens) / self.rate)
+
+
+class ReminderDispatcher:
+    """Wraps a sender with the rate limit and retries (exponential backoff)."""
+
+    def __init__(self, sender, limiter, max_retries=3, backoff=2.0, sleep=time.sleep):
+        self.sender = sender
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+
+    def send(self, to, subject, body):
+        """Returns True once sent, False after the last retry failed."""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                self.sender.send(to, subject, body)
+                return True
+            except (smtplib.SMTPException, OSError) as exc:
+                if attempt == self.max_retries:
+                    print(f"[reminder] giving up on {to}: {exc}")
+                    return False
+                self.sleep(self.backoff * 2 ** attempt)
+
+
+# --- SCANNING ---
+
+# Open tasks past their due date that have no reminder_log entry for that due date.
+# Range on idx_tasks_open_due + primary-key probes into reminder_log, so a scan reads
+# the open overdue tasks only. No high-water mark: a task can become overdue without
+# a new id or a new due date (due date moved back, done task reopened).
+NEW_OVERDUE_SQL = """
+    SELECT t.id, t.title, t.due_date, t.roommate_id,
+           rm.name as roommate_name, rm.email as roommate_email
+    FROM tasks t
+    JOIN roommates rm ON t.roommate_id = rm.id
+    WHERE t.status != 'done' AND t.due_date < ?
+      AND NOT EXISTS (
+          SELECT 1 FROM reminder_log l
+          WHERE l.task_id = t.id AND l.due_date = t.due_date
+      )
+    ORDER BY rm.id, t.due_date
+"""
+
+
+def find_new_overdue(conn, today):
+    """Overdue tasks nobody was reminded about yet (for their current due date)."""
+    return conn.execute(NEW_OVERDUE_SQL, (today,)).fetchall()
+
+
+def group_by_roommate(rows):
+    """Logic: rows sorted by roommate -> {roommate_id: {name, email, tasks}}"""
+    groups = {}
+    for row in rows:
+        group = groups.setdefault(row['roommate_id'], {
+            'name': row['roommate_name'],
+            'email': row['roommate_email'],
+            'tasks': [],
+        })
+        group['tasks'].append(row)
+    return groups
+
+
+def format_reminder(group):
+    lines = [f"Hi {group['name']},", '', 'These chores are overdue:', '']
+    lines += [f"- {t['title']} (due {t['due_date']})" for t in group['tasks']]
+    lines += ['', 'Please mark them as done in DormMate once finished.']
+    count = len(group['tasks'])
+    subject = f"DormMate: {count} overdue task{'s' if count != 1 else ''}"
+    return subject, '\n'.join(lines)
+
+
+CLAIM_SQL = """
+    INSERT OR IGNORE INTO reminder_log (task_id, due_date, roommate_id, sent_at)
+    VALUES (?, ?, ?, DATETIME('now'))
+"""
+
+
+def claim(conn, tasks):
+    """
+    Tasks whose reminder_log row this scan inserted. The insert waits for the write
+    lock, so a scanner running at the same time sees our rows and skips them.
+    """
+    claimed = [t for t in tasks
+               if conn.execute(CLAIM_SQL, (t['id'], t['due_date'], t['roommate_id'])).rowcount == 1]
+    conn.commit()
+    return claimed
+
+
+def release(conn, tasks):
+    """Give the claims back after a failed send, so the next scan retries them."""
+    conn.executemany('DELETE FROM reminder_log WHERE task_id = ? AND due_date = ?',
+                     [(t['id'], t['due_date']) for t in tasks])
+    conn.commit()
+
+
+def run_once(conn, dispatcher, today=None):
+    """One scan: returns (emails sent, emails failed)."""
+    today = today or date.today().isoformat()
+    rows = find_new_overdue(conn, today)
+
+    sent = failed = 0
+    for group in group_by_roommate(rows).values():
+        tasks = claim(conn, group['tasks'])
+        if not tasks:
+            continue  # another scanner got there first
+        subject, body = format_reminder({**group, 'tasks': tasks})
+        try:
+            ok = dispatcher.send(group['email'], subject, body)
+        except Exception as exc:  # e.g. a malformed address: skip this roommate only
+            print(f"[reminder] cannot send to {group['email']!r}: {exc}")
+            ok = False
+        if ok:
+            sent += 1
+        else:
+            failed += 1
+            release(conn, tasks)
+    return sent, failed
+
+
+# --- BACKGROUND THREAD ---
+
+class ReminderScheduler(IntervalWorker):
+    """Calls run_once() every `interval` seconds until stop()."""
+
+    def __init__(self, dispatcher, interval):
+        super().__init__('reminder-scheduler', interval)
+        self.dispatcher = dispatcher
+
+    def tick(self, conn):
+        run_once(conn, self.dispatcher)
+
+
+def build_sender():
+    """SMTP when Config.SMTP_HOST is set, otherwise the local stand-in."""
+    if Config.SMTP_HOST:
+        return SMTPSender(
+            Config.SMTP_HOST, Config.SMTP_PORT, Config.SMTP_USERNAME, Config.SMTP_PASSWORD,
+            use_tls=Config.SMTP_USE_TLS, sender=Config.SMTP_FROM, pool_size=Config.SMTP_POOL_SIZE,
+        )
+    return LocalSender(echo=True)
+
+
+def build_dispatcher(sender=None):
+    limiter = RateLimiter(Config.REMINDER_RATE, Config.REMINDER_BURST)
+    return ReminderDispatcher(sender or build_sender(), limiter, Config.REMINDER_MAX_RETRIES)
+
+
+scheduler = WorkerSlot()
+
+
+def start_scheduler(dispatcher=None):
+    """Start the background thread once per process."""
+    return scheduler.start(
+        lambda: ReminderScheduler(dispatcher or build_dispatcher(), Config.REMINDER_INTERVAL))
+
+
+def init_app(app):
+    """
+    Start the scheduler with the first request (only when REMINDERS_ENABLED is on).
+    Waiting for a request keeps it out of the debug reloader's watcher process.
+    With several gunicorn workers, prefer one dedicated process instead:
+        python -m app.reminders --loop
+    """
+    if not Config.REMINDERS_ENABLED:
+        return
+    # Built now so a bad SMTP configuration fails at startup, not in the thread
+    dispatcher = build_dispatcher()
+
+    @app.before_request
+    def _start_reminders():
+        start_scheduler(dispatcher)
+
+
+if __name__ == '__main__':
+    if '--loop' in sys.argv:
+        # Dedicated reminder process: scan forever, Ctrl+C to stop
+        try:
+            start_scheduler().join()
+        except KeyboardInterrupt:
+            scheduler.worker.stop()
+        sys.exit(0)
+
+    conn = connect()
+    sent, failed = run_once(conn, build_dispatcher())
+    conn.close()
+    print(f"Reminders sent: {sent}, failed: {failed}")
+    sys.exit(1 if failed else 0)
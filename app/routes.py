@@ -1,23 +1,80 @@
 import sqlite3
 from flask import  Blueprint, request, jsonify
-from .models import get_db
+from config import Config
+from .models import get_db, TASK_COLUMNS, ROOMMATE_COLUMNS
+from .models import insert_tasks, update_task_statuses, delete_tasks, valid_email
+from .utils import list_rows
+from .cache import cache, cached, conditional
+from .events import event_stream, publish_upsert, publish_delete
+from .stats import read_stats
 from datetime import datetime, timedelta
 
 main = Blueprint('main', __name__)
 
 
+# Dashboard view queries.
+# Kept at module level so tests/test_query_plans.py can check they stay on an index.
+# idx_tasks_open_due covers both of these (partial index on status != 'done')
+UPCOMING_TASKS_SQL = """
+    SELECT t.*, r.name as room_name 
+    FROM tasks t
+    LEFT JOIN rooms r ON t.room_id = r.id
+    WHERE t.due_date > DATE('now') AND t.status != 'done'
+    ORDER BY t.due_date ASC
+"""
+
+OVERDUE_TASKS_SQL = """
+    SELECT t.*, rm.name as roommate_name, rm.email as roommate_email
+    FROM tasks t
+    JOIN roommates rm ON t.roommate_id = rm.id
+    WHERE t.due_date < DATE('now') AND t.status != 'done'
+    ORDER BY t.due_date ASC
+"""
+
+# idx_tasks_done_completed (partial index on status = 'done')
+COMPLETED_WEEK_SQL = """
+    SELECT * FROM tasks
+    WHERE status = 'done' 
+    AND completed_at >= DATE('now', '-7 days')
+    ORDER BY completed_at DESC
+"""
+
+# Room map: every room with its open task count (task_counts, kept up to date by triggers)
+ROOMS_SQL = """
+    SELECT r.id, r.name, r.pos_x, r.pos_y, r.color, COALESCE(c.open_count, 0) AS open_tasks
+    FROM rooms r
+    LEFT JOIN task_counts c ON c.scope = 'room' AND c.key = r.id
+    ORDER BY r.id
+"""
+
+# Same, limited to a viewport through the rooms_rtree spatial index
+ROOMS_IN_VIEW_SQL = """
+    SELECT r.id, r.name, r.pos_x, r.pos_y, r.color, COALESCE(c.open_count, 0) AS open_tasks
+    FROM rooms_rtree box
+    JOIN rooms r ON r.id = box.id
+    LEFT JOIN task_counts c ON c.scope = 'room' AND c.key = r.id
+    WHERE box.max_x >= :min_x AND box.min_x <= :max_x
+      AND box.max_y >= :min_y AND box.min_y <= :max_y
+    ORDER BY r.id
+"""
+
+VIEWPORT_PARAMS = ('min_x', 'min_y', 'max_x', 'max_y')
+
+
 # tasks routes
 
 # GET tasks
 
 @main.route('/tasks', methods=['GET'])
+@conditional('tasks')
+@cached('tasks')
 def get_tasks():
-    """Fetch all tasks from the local SQLite database."""
+    """
+    Fetch tasks from the local SQLite database.
+    Supports ?after_id=&limit= pages, ?fields= projection and ?stream=1.
+    """
     conn = get_db()
-    # Select all tasks and convert them to dictionaries
-    tasks = conn.execute('SELECT * FROM tasks').fetchall()
-    conn.close()
-    return jsonify([dict(t) for t in tasks])
+    return list_rows(conn, 'tasks', TASK_COLUMNS)
 
 # POST /tasks
 @main.route('/tasks', methods=['POST'])
@@ -26,21 +83,13 @@ def create_task():
     data = request.get_json()
     
     conn = get_db()
-    conn.execute('''
-        INSERT INTO tasks (title, description, roommate_id, due_date, priority, status)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('title'), 
-        data.get('description'), 
-        data.get('roommate_id'), 
-        data.get('room_id'),
-        data.get('due_date'), 
-        data.get('priority', 'Low'),
-        'Pending' # Default status for new tasks
-    ))
+    # Same insert path as POST /tasks/bulk, just with a single item
+    result = insert_tasks(conn, [data])[0]
+    if 'error' in result:
+        return jsonify({'error': result['error']}), 400
     conn.commit()
-    conn.close()
-    return jsonify({"message": "Task created successfully"}), 201
+    publish_upsert(conn, 'tasks', [result['id']])
+    return jsonify({"message": "Task created successfully", "id": result['id']}), 201
 
 
 # PUT /tasks/<id>
@@ -84,7 +133,7 @@ def update_task(task_id):
         ))
         
     conn.commit()
-    conn.close()
+    publish_upsert(conn, 'tasks', [task_id])
     return jsonify({"message": "Task updated successfully"}), 200
 
 
@@ -99,22 +148,91 @@ def delete_task(task_id):
     conn = get_db()
     conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
     conn.commit()
-    conn.close()
+    publish_delete(conn, 'tasks', [task_id])
     return jsonify({"message": "Task deleted successfully"}), 200
 
 
+# --- BULK TASKS ---
+# One request, one transaction, one executemany per batch.
+# Every item gets its own result so the client knows which ones failed.
+
+def _bulk_items(key):
+    """Accept either a bare JSON array or {"<key>": [...]}; returns (items, error_response)."""
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get(key)
+    if not isinstance(data, list) or not data:
+        return None, (jsonify({'error': f'Send a non-empty array (or {{"{key}": [...]}})'}), 400)
+    if len(data) > Config.BULK_MAX_ITEMS:
+        return None, (jsonify({'error': f'At most {Config.BULK_MAX_ITEMS} items per request'}), 413)
+    return data, None
+
+
+def _bulk_response(results, ok_status=200):
+    succeeded = sum(1 for r in results if 'error' not in r)
+    return jsonify({
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+    }), ok_status if succeeded else 400
+
+
+# POST /tasks/bulk
+@main.route('/tasks/bulk', methods=['POST'])
+def create_tasks_bulk():
+    """Create many tasks at once: [{"title": ...}, ...] (same fields as POST /tasks)."""
+    items, error = _bulk_items('tasks')
+    if error:
+        return error
+
+    conn = get_db()
+    results = insert_tasks(conn, items)
+    conn.commit()
+    publish_upsert(conn, 'tasks', [r.get('id') for r in results if 'error' not in r])
+    return _bulk_response(results, 201)
+
+
+# PATCH /tasks/bulk
+@main.route('/tasks/bulk', methods=['PATCH'])
+def update_tasks_bulk():
+    """Change the status of many tasks: [{"id": 1, "status": "done"}, ...]"""
+    items, error = _bulk_items('tasks')
+    if error:
+        return error
+
+    conn = get_db()
+    results = update_task_statuses(conn, items)
+    conn.commit()
+    publish_upsert(conn, 'tasks', [r['id'] for r in results if 'error' not in r])
+    return _bulk_response(results)
+
+
+# DELETE /tasks/bulk
+@main.route('/tasks/bulk', methods=['DELETE'])
+def delete_tasks_bulk():
+    """Delete many tasks: [1, 2, 3] or {"ids": [1, 2, 3]}"""
+    ids, error = _bulk_items('ids')
+    if error:
+        return error
+
+    conn = get_db()
+    results = delete_tasks(conn, ids)
+    conn.commit()
+    publish_delete(conn, 'tasks', [r['id'] for r in results if 'error' not in r])
+    return _bulk_response(results)
+
+
 
 # roommates routes
 
 # GET roommates
 @main.route('/roommates', methods=['GET'])
+@conditional('roommates')
+@cached('roommates')
 def get_roommates():
+    """Same paging / ?fields= / ?stream=1 options as GET /tasks."""
     conn = get_db()
-    #fetch all the columns
-    roommates = conn.execute('SELECT * FROM roommates').fetchall()
-    conn.close()
-    
-    return jsonify([dict(roommate) for roommate in roommates])
+    return list_rows(conn, 'roommates', ROOMMATE_COLUMNS)
 
 # POST /roommates
 @main.route('/roommates', methods=['POST'])
@@ -128,19 +246,20 @@ def create_roommate():
     # We must have both fields to ensure the reminder logic has an email to use later
     if not data.get('name') or not data.get('email'):
         return jsonify({'error': 'Name and Email are mandatory fields'}), 400
+    if not valid_email(data['email']):
+        return jsonify({'error': 'Email is not a valid address'}), 400
     
     conn = get_db()
     try:
         # We insert the data provided by the frontend
-        conn.execute('INSERT INTO roommates (name, email) VALUES (?, ?)', 
-                     (data['name'], data['email']))
+        cur = conn.execute('INSERT INTO roommates (name, email) VALUES (?, ?)', 
+                           (data['name'], data['email']))
         conn.commit()
     except sqlite3.IntegrityError:
         # This catches errors if the email already exists (because of our UNIQUE constraint)
         return jsonify({'error': 'This email is already registered'}), 400
-    finally:
-        conn.close()
 
+    publish_upsert(conn, 'roommates', [cur.lastrowid])
     return jsonify({'message': 'Roommate created successfully'}), 201
 
 # --- UPDATE ROOMMATE (Fix typos or change email) ---
@@ -150,6 +269,8 @@ def update_roommate(roommate_id):
     Update a roommate's details.
     """
     data = request.get_json()
+    if not valid_email(data.get('email')):
+        return jsonify({'error': 'Email is not a valid address'}), 400
     conn = get_db()
     
     # We update both name and email if provided
@@ -165,9 +286,8 @@ def update_roommate(roommate_id):
     except sqlite3.IntegrityError:
         # Prevents changing an email to one that already exists
         return jsonify({'error': 'Email already in use'}), 400
-    finally:
-        conn.close()
 
+    publish_upsert(conn, 'roommates', [roommate_id])
     return jsonify({"message": "Roommate updated successfully"}), 200
 
 
@@ -181,17 +301,46 @@ def delete_roommate(roommate_id):
     """
     conn = get_db()
     
+    # Remember which tasks lose their owner so open dashboards can update them
+    unassigned = [row['id'] for row in conn.execute(
+        'SELECT id FROM tasks WHERE roommate_id = ?', (roommate_id,))]
     conn.execute('UPDATE tasks SET roommate_id = NULL WHERE roommate_id = ?', (roommate_id,))  # Set to NULL before deleting
     conn.execute('DELETE FROM roommates WHERE id = ?', (roommate_id,))
     conn.commit()
-    conn.close()
+    publish_delete(conn, 'roommates', [roommate_id])
+    publish_upsert(conn, 'tasks', unassigned)
     return jsonify({"message": "Roommate deleted"}), 200
     
 
+# --- ROOM MAP ---
+@main.route('/rooms', methods=['GET'])
+@conditional('rooms', 'tasks')
+@cached('rooms', 'tasks')
+def get_rooms():
+    """
+    Logic: Rooms for the map, each with its number of open tasks (one query).
+    ?min_x=&min_y=&max_x=&max_y= -> only the rooms inside that box (the visible part of the map).
+    Without them every room is returned (e.g. for the room dropdown).
+    """
+    viewport = {name: request.args.get(name, type=float) for name in VIEWPORT_PARAMS}
+    given = [name for name in VIEWPORT_PARAMS if name in request.args]
+
+    conn = get_db()
+    if not given:
+        rooms = conn.execute(ROOMS_SQL).fetchall()
+    elif len(given) < len(VIEWPORT_PARAMS) or None in viewport.values():
+        return jsonify({'error': f"Viewport needs numeric {', '.join(VIEWPORT_PARAMS)}"}), 400
+    else:
+        rooms = conn.execute(ROOMS_IN_VIEW_SQL, viewport).fetchall()
+    return jsonify([dict(room) for room in rooms])
+
+
 # Upcoming tasks
 
 # --- UPCOMING TASKS ---
 @main.route('/tasks/upcoming', methods=['GET'])
+@conditional('tasks', 'rooms')
+@cached('tasks', 'rooms')
 def upcoming_tasks():
     """
     Logic: Select tasks where due_date is in the future.
@@ -199,47 +348,62 @@ def upcoming_tasks():
     """
     conn = get_db()
     # We use a JOIN to get the room name directly
-    tasks = conn.execute("""
-        SELECT t.*, r.name as room_name 
-        FROM tasks t
-        LEFT JOIN rooms r ON t.room_id = r.id
-        WHERE t.due_date > DATE('now') AND t.status != 'done'
-        ORDER BY t.due_date ASC
-    """).fetchall()
-    conn.close()
+    tasks = conn.execute(UPCOMING_TASKS_SQL).fetchall()
     return jsonify([dict(task) for task in tasks])
 
 # --- OVERDUE TASKS ---
 @main.route('/tasks/overdue', methods=['GET'])
+@conditional('tasks', 'roommates')
+@cached('tasks', 'roommates')
 def overdue_tasks():
     """
     Logic: Select tasks where due_date has passed and status is NOT 'done'.
-    These are the tasks that will trigger the automatic email reminders.
+    These are the tasks that trigger the automatic email reminders (app/reminders.py).
     """
     conn = get_db()
-    tasks = conn.execute("""
-        SELECT t.*, rm.name as roommate_name, rm.email as roommate_email
-        FROM tasks t
-        JOIN roommates rm ON t.roommate_id = rm.id
-        WHERE t.due_date < DATE('now') AND t.status != 'done'
-        ORDER BY t.due_date ASC
-    """).fetchall()
-    conn.close()
+    tasks = conn.execute(OVERDUE_TASKS_SQL).fetchall()
     return jsonify([dict(task) for task in tasks])
 
 # --- COMPLETED THIS WEEK ---
 @main.route('/tasks/completed-week', methods=['GET'])
+@conditional('tasks')
+@cached('tasks')
 def completed_this_week():
     """
     Logic: Select tasks completed in the last 7 days.
     Uses 'completed_at' which is filled by our PUT route.
     """
     conn = get_db()
-    tasks = conn.execute("""
-        SELECT * FROM tasks
-        WHERE status = 'done' 
-        AND completed_at >= DATE('now', '-7 days')
-        ORDER BY completed_at DESC
-    """).fetchall()
-    conn.close()
-    return jsonify([dict(task) for task in tasks])
\ No newline at end of file
+    tasks = conn.execute(COMPLETED_WEEK_SQL).fetchall()
+    return jsonify([dict(task) for task in tasks])
+
+
+# --- DASHBOARD STATS ---
+@main.route('/stats', methods=['GET'])
+@conditional('tasks', 'roommates', 'rooms')
+@cached('tasks', 'roommates', 'rooms')
+def dashboard_stats():
+    """
+    Counts for the dashboard cards (open / overdue / upcoming / completed this week)
+    plus open and done tasks per roommate and per room.
+    Read from summary tables the triggers keep up to date, so no task rows are scanned.
+    """
+    conn = get_db()
+    return jsonify(read_stats(conn))
+
+
+# --- LIVE UPDATES ---
+@main.route('/events', methods=['GET'])
+def live_events():
+    """
+    Server-Sent Events stream of row diffs.
+    event: tasks / roommates, data: {"action": "upsert", "rows": [...]} or {"action": "delete", "ids": [...]}
+    """
+    return event_stream()
+
+
+# --- CACHE STATS ---
+@main.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit / miss counters of the response cache (per worker process)."""
+    return jsonify(cache.stats())
\ No newline at end of file
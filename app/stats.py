@@ -0,0 +1,116 @@
+"""
+Dashboard numbers from the task_counts / task_day_counts summary tables.
+
+The triggers created in init_db() (migration 5) keep those tables up to date
+on every insert/update/delete, so reading the stats never scans tasks.
+
+Recompute them from scratch, or only check they still match the tasks table:
+    python -m app.stats --rebuild
+    python -m app.stats --verify
+"""
+import sys
+
+from .models import REBUILD_STATS_SQL, connect
+
+
+def read_stats(conn):
+    """Logic: a handful of primary-key / tiny-table reads -> the GET /stats payload"""
+    totals = conn.execute(
+        "SELECT open_count, done_count FROM task_counts WHERE scope = 'all' AND key = 0"
+    ).fetchone()
+
+    # Time-based numbers are sums over one row per day, not over tasks
+    days = conn.execute("""
+        SELECT
+            COALESCE(SUM(CASE WHEN kind = 'due' AND day < DATE('now') THEN count END), 0) AS overdue,
+            COALESCE(SUM(CASE WHEN kind = 'due' AND day = DATE('now') THEN count END), 0) AS due_today,
+            COALESCE(SUM(CASE WHEN kind = 'due' AND day > DATE('now') THEN count END), 0) AS upcoming,
+            COALESCE(SUM(CASE WHEN kind = 'done' AND day >= DATE('now', '-7 days') THEN count END), 0)
+                AS completed_this_week
+        FROM task_day_counts
+    """).fetchone()
+
+    per_roommate = conn.execute("""
+        SELECT c.key AS roommate_id, rm.name, c.open_count AS open, c.done_count AS done
+        FROM task_counts c
+        LEFT JOIN roommates rm ON rm.id = c.key
+        WHERE c.scope = 'roommate' AND (c.open_count != 0 OR c.done_count != 0)
+        ORDER BY c.key
+    """).fetchall()
+
+    per_room = conn.execute("""
+        SELECT c.key AS room_id, r.name, c.open_count AS open, c.done_count AS done
+        FROM task_counts c
+        LEFT JOIN rooms r ON r.id = c.key
+        WHERE c.scope = 'room' AND (c.open_count != 0 OR c.done_count != 0)
+        ORDER BY c.key
+    """).fetchall()
+
+    return {
+        'totals': {
+            'open': totals['open_count'] if totals else 0,
+            'done': totals['done_count'] if totals else 0,
+            **dict(days),
+        },
+        # key 0 means "unassigned" / "no room"
+        'per_roommate': [dict(row) for row in per_roommate],
+        'per_room': [dict(row) for row in per_room],
+    }
+
+
+def _snapshot(conn):
+    counts = conn.execute(
+        'SELECT scope, key, open_count, done_count FROM task_counts '
+        'WHERE open_count != 0 OR done_count != 0 ORDER BY scope, key'
+    ).fetchall()
+    days = conn.execute(
+        'SELECT kind, day, count FROM task_day_counts WHERE count != 0 ORDER BY kind, day'
+    ).fetchall()
+    return [tuple(r) for r in counts], [tuple(r) for r in days]
+
+
+def rebuild(conn):
+    """Throw the aggregates away and recompute them from tasks (one transaction)."""
+    for statement in REBUILD_STATS_SQL:
+        conn.execute(statement)
+    # /stats is cached and ETagged on the 'tasks' version: make it see the new numbers
+    conn.execute("""
+        UPDATE table_versions SET version = version + 1, updated_at = strftime('%s', 'now')
+        WHERE name = 'tasks'
+    """)
+    conn.commit()
+
+
+def verify(conn):
+    """
+    Recompute inside a transaction we roll back, and compare with what the
+    triggers maintained. Returns a list of differences (empty = consistent).
+    """
+    maintained = _snapshot(conn)
+    try:
+        for statement in REBUILD_STATS_SQL:
+            conn.execute(statement)
+        expected = _snapshot(conn)
+    finally:
+        conn.rollback()
+
+    problems = []
+    for label, have, want in zip(('task_counts', 'task_day_counts'), maintained, expected):
+        for row in sorted(set(have) - set(want)):
+            problems.append(f'{label}: unexpected {row}')
+        for row in sorted(set(want) - set(have)):
+            problems.append(f'{label}: missing {row}')
+    return problems
+
+
+if __name__ == '__main__':
+    conn = connect()
+    if '--rebuild' in sys.argv:
+        rebuild(conn)
+        print('Stats rebuilt from the tasks table.')
+    problems = verify(conn)
+    conn.close()
+    for problem in problems:
+        print(problem)
+    print('Stats are consistent.' if not problems else f'{len(problems)} difference(s) found.')
+    sys.exit(1 if problems else 0)
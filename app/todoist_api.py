@@ -1,12 +1,192 @@
+"""
+Todoist -> local tasks sync.
+
+Logic: keep-alive HTTP session -> incremental Sync API call with the last
+sync_token -> upsert changed items into the tasks table in batches ->
+remember the new sync_token. Runs in a background thread, never on the
+request path.
+
+One sync by hand, or keep syncing in a dedicated process:
+    python -m app.todoist_api
+    python -m app.todoist_api --loop
+"""
+import json
+import sys
+
 import requests
-import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from .models import connect
+from .workers import IntervalWorker, WorkerSlot
+
+
+class TodoistClient:
+    """Small Sync API client with a pooled session and bounded timeouts."""
+
+    def __init__(self, token, base_url=None, timeout=None, pool_size=4):
+        self.base_url = (base_url or Config.TODOIST_BASE_URL).rstrip('/')
+        # (connect, read) seconds: a slow Todoist must never hang the worker
+        self.timeout = timeout or (Config.TODOIST_CONNECT_TIMEOUT, Config.TODOIST_READ_TIMEOUT)
+
+        self.session = requests.Session()
+        self.session.headers.update({'Authorization': f'Bearer {token}'})
+        # Reuse TCP/TLS connections and retry transient errors with backoff
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=None, respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def sync(self, sync_token='*'):
+        """
+        One incremental sync call. '*' means "send me everything".
+        Returns the parsed JSON: {"sync_token": ..., "full_sync": bool, "items": [...]}
+        """
+        response = self.session.post(
+            f'{self.base_url}/sync',
+            data={'sync_token': sync_token, 'resource_types': json.dumps(['items'])},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+
+# --- MAPPING TODOIST ITEMS TO OUR TASKS ---
+
+# Todoist priority: 4 = most urgent, 1 = normal
+PRIORITIES = {4: 'High', 3: 'Medium'}
+
+
+def to_task_row(item):
+    """Logic: Todoist item dict -> values for the tasks upsert"""
+    due = item.get('due') or {}
+    done = bool(item.get('checked'))
+    return (
+        str(item['id']),
+        item.get('content') or '(untitled)',
+        item.get('description') or None,
+        (due.get('date') or '')[:10] or None,  # keep YYYY-MM-DD like the rest of the app
+        PRIORITIES.get(item.get('priority'), 'Low'),
+        'done' if done else 'Pending',
+        # same 'YYYY-MM-DD HH:MM:SS' shape as DATETIME('now') in our PUT route
+        (item.get('completed_at') or '')[:19].replace('T', ' ') or None if done else None,
+    )
+
+
+def upsert_items(conn, items, batch_size=None):
+    """
+    Write a page of Todoist items into tasks, batch_size rows per executemany.
+    Returns (ids of upserted local tasks, ids of deleted local tasks).
+    """
+    batch_size = batch_size or Config.TODOIST_BATCH_SIZE
+    live = [to_task_row(item) for item in items if not item.get('is_deleted')]
+    deleted = [str(item['id']) for item in items if item.get('is_deleted')]
+
+    for start in range(0, len(live), batch_size):
+        conn.executemany('''
+            INSERT INTO tasks (todoist_id, title, description, due_date, priority, status, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(todoist_id) WHERE todoist_id IS NOT NULL DO UPDATE SET
+                title = excluded.title,
+                description = excluded.description,
+                due_date = excluded.due_date,
+                priority = excluded.priority,
+                status = excluded.status,
+                completed_at = excluded.completed_at
+        ''', live[start:start + batch_size])
+
+    def local_ids(todoist_ids):
+        rows = conn.execute(
+            'SELECT id FROM tasks WHERE todoist_id IN (SELECT value FROM json_each(?))',
+            (json.dumps(todoist_ids),),
+        ).fetchall()
+        return [row['id'] for row in rows]
+
+    upserted = local_ids([row[0] for row in live]) if live else []
+    removed = local_ids(deleted) if deleted else []
+    if removed:
+        conn.executemany('DELETE FROM tasks WHERE id = ?', [(i,) for i in removed])
+    return upserted, removed
+
+
+# --- ONE SYNC ROUND ---
+
+def _get_token(conn):
+    row = conn.execute("SELECT value FROM scheduler_state WHERE name = 'todoist_sync_token'").fetchone()
+    return row['value'] if row else '*'
+
+
+def sync_once(conn, client):
+    """Fetch what changed since the stored sync_token and apply it in one transaction."""
+    payload = client.sync(_get_token(conn))
+    upserted, removed = upsert_items(conn, payload.get('items', []))
+    conn.execute('''
+        INSERT INTO scheduler_state (name, value) VALUES ('todoist_sync_token', ?)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value
+    ''', (payload['sync_token'],))
+    conn.commit()
+
+    # Let open dashboards know about the new rows
+    # (the response cache follows table_versions, which the triggers already bumped)
+    if upserted or removed:
+        from .events import publish_upsert, publish_delete
+        publish_upsert(conn, 'tasks', upserted)
+        publish_delete(conn, 'tasks', removed)
+    return len(upserted), len(removed)
+
+
+class TodoistSyncWorker(IntervalWorker):
+    """Calls sync_once() every `interval` seconds until stop()."""
+
+    def __init__(self, client, interval):
+        super().__init__('todoist-sync', interval)
+        self.client = client
+
+    def tick(self, conn):
+        sync_once(conn, self.client)
+
+    def close(self):
+        self.client.close()
+
+
+worker = WorkerSlot()
+
+
+def start_worker():
+    """Start the background sync once per process."""
+    return worker.start(
+        lambda: TodoistSyncWorker(TodoistClient(Config.TODOIST_API_TOKEN), Config.TODOIST_SYNC_INTERVAL))
+
+
+def init_app(app):
+    """Start syncing with the first request (only when a Todoist token is configured)."""
+    if not (Config.TODOIST_SYNC_ENABLED and Config.TODOIST_API_TOKEN):
+        return
+
+    @app.before_request
+    def _start_todoist_sync():
+        start_worker()
+
+
+if __name__ == '__main__':
+    if not Config.TODOIST_API_TOKEN:
+        sys.exit('Set TODOIST_API_TOKEN first.')
 
-TODOIST_API_TOKEN = os.getenv("TODOIST_API_TOKEN")
-HEADERS = {
-    "Authorization": f"Bearer {TODOIST_API_TOKEN}",
-    "Content-Type": "application/json"
-}
+    if '--loop' in sys.argv:
+        try:
+            start_worker().join()
+        except KeyboardInterrupt:
+            worker.worker.stop()
+        sys.exit(0)
 
-response = requests.get("https://api.todoist.com/rest/v2/tasks", headers=headers)
-tasks = response.json()
-print(tasks)
\ No newline at end of file
+    conn = connect()
+    client = TodoistClient(Config.TODOIST_API_TOKEN)
+    upserted, removed = sync_once(conn, client)
+    client.close()
+    conn.close()
+    print(f"Todoist sync: {upserted} upserted, {removed} removed")
@@ -0,0 +1,113 @@
+import json
+from flask import request, jsonify, Response, stream_with_context
+
+# Page size used when the client asks for a page without saying how big
+DEFAULT_PAGE_SIZE = 100
+# Upper bound so a single request can never pull the whole table into memory
+MAX_PAGE_SIZE = 1000
+# Bytes of JSON gathered before each write of a ?stream=1 response
+STREAM_CHUNK_SIZE = 16384
+
+
+def parse_fields(columns):
+    """
+    Logic: ?fields=id,title -> keep only known column names (in the order asked).
+    Returns (fields, unknown). No ?fields= means every column.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return list(columns), []
+
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in columns]
+    return fields, unknown
+
+
+def stream_rows(cursor, fields, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield a JSON array piece by piece, straight from the cursor.
+    Rows are grouped into ~chunk_size pieces: one write per row is cheap
+    under WSGI but costs a thread hop per row behind the ASGI server.
+    """
+    parts = ['[']
+    size = 1
+    first = True
+    for row in cursor:
+        piece = json.dumps({f: row[f] for f in fields})
+        if not first:
+            piece = ',' + piece
+        first = False
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(parts)
+            parts, size = [], 0
+    parts.append(']')
+    yield ''.join(parts)
+
+
+def list_rows(conn, table, columns):
+    """
+    Shared logic for the "list everything" GET routes.
+
+    - ?fields=a,b      -> only return these columns
+    - ?after_id=&limit= -> keyset pagination on the primary key (no OFFSET scans)
+    - ?stream=1        -> send rows as they are read instead of building the full list
+
+    Without any of these it behaves like the old SELECT * (full list, plain JSON array).
+    """
+    fields, unknown = parse_fields(columns)
+    if unknown:
+        return jsonify({'error': f"Unknown field(s): {', '.join(unknown)}"}), 400
+
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', type=int)
+    # A typo must not fall back to the unpaginated full table
+    for name, value in (('after_id', after_id), ('limit', limit)):
+        if name in request.args and value is None:
+            return jsonify({'error': f'{name} must be an integer'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    paginate = after_id is not None or limit is not None
+
+    # We always read the id so we can hand back the next cursor,
+    # even if the client did not ask for it in ?fields=
+    select_cols = fields if 'id' in fields else ['id'] + fields
+    sql = f"SELECT {', '.join(select_cols)} FROM {table}"
+    params = []
+    if after_id is not None:
+        sql += ' WHERE id > ?'
+        params.append(after_id)
+    sql += ' ORDER BY id'
+    if paginate:
+        limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        sql += ' LIMIT ?'
+        params.append(limit)
+
+    # Streaming mode: the connection stays checked out until the last row is sent
+    if request.args.get('stream') in ('1', 'true'):
+        next_after_id = None
+        if paginate:
+            # Headers go out before the rows, so look up the page's last id first
+            # (one index step on the primary key; later inserts get higher ids)
+            row = conn.execute(
+                f"SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT 1 OFFSET ?",
+                (after_id if after_id is not None else 0, limit - 1),
+            ).fetchone()
+            next_after_id = row['id'] if row else None
+        cursor = conn.execute(sql, params)
+        response = Response(stream_with_context(stream_rows(cursor, fields)),
+                            mimetype='application/json')
+        if next_after_id is not None:
+            response.headers['X-Next-After-Id'] = str(next_after_id)
+        return response
+
+    cursor = conn.execute(sql, params)
+
+    rows = cursor.fetchall()
+    response = jsonify([{f: row[f] for f in fields} for row in rows])
+
+    # A full page means there may be more: tell the client where to continue
+    if paginate and len(rows) == limit:
+        response.headers['X-Next-After-Id'] = str(rows[-1]['id'])
+    return response
@@ -0,0 +1,58 @@
+import threading
+
+from .models import connect
+
+
+class IntervalWorker(threading.Thread):
+    """
+    Daemon thread for a background job (reminder scans, Todoist sync).
+
+    Logic: open its own connection -> call tick(conn) every `interval` seconds
+    until stop() -> a failed tick is rolled back and logged, never kills the
+    thread. Subclasses implement tick() and may release resources in close().
+    """
+
+    def __init__(self, name, interval):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def tick(self, conn):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def run(self):
+        conn = connect()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    self.tick(conn)
+                except Exception as exc:  # network, bad data or a locked database: retry next round
+                    conn.rollback()
+                    print(f"[{self.name}] failed: {exc}")
+                self._stop_event.wait(self.interval)
+        finally:
+            conn.close()
+            self.close()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+class WorkerSlot:
+    """Holds the one running worker of a kind (the first requests can arrive together)."""
+
+    def __init__(self):
+        self.worker = None
+        self._lock = threading.Lock()
+
+    def start(self, build):
+        """Build and start the worker unless it already runs; returns it either way."""
+        with self._lock:
+            if self.worker is None:
+                self.worker = build()
+                self.worker.start()
+        return self.worker
@@ -0,0 +1,67 @@
+"""
+Production entry point: the API behind an ASGI server (uvicorn).
+
+    pip install uvicorn a2wsgi
+    python asgi.py --workers 2 --threads 16 --db-threads 4
+    # or: uvicorn asgi:app --workers 2
+
+run.py keeps starting the Flask development server as before.
+"""
+import argparse
+import os
+
+from app import create_app
+from app.asgi import DormMateASGI
+from app.models import init_db
+
+
+
+def build(threads=None, db_threads=None):
+    """
+    The ASGI app; sizes default to Config.ASGI_THREADS / ASGI_DB_THREADS.
+    Creates / migrates the database first: `uvicorn asgi:app` never runs the
+    __main__ block below, and every worker process builds its own app.
+    """
+    init_db()
+    return DormMateASGI(create_app(), threads=threads, db_threads=db_threads)
+
+
+# For `uvicorn asgi:app` (and the worker processes of `python asgi.py --workers N`)
+app = build() if __name__ != '__main__' else None
+
+if __name__ == '__main__':
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Serve DormMate over ASGI.")
+    parser.add_argument('--host', default=Config.ASGI_HOST)
+    parser.add_argument('--port', type=int, default=Config.ASGI_PORT)
+    parser.add_argument('--workers', type=int, default=Config.ASGI_WORKERS,
+                        help='worker processes')
+    parser.add_argument('--threads', type=int, default=Config.ASGI_THREADS,
+                        help='threads per worker for the regular Flask routes')
+    parser.add_argument('--db-threads', type=int, default=Config.ASGI_DB_THREADS,
+                        help='threads per worker for async database queries')
+    parser.add_argument('--shutdown-timeout', type=int, default=Config.ASGI_SHUTDOWN_TIMEOUT,
+                        help='seconds to let open requests finish on SIGTERM')
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.workers > 1:
+        # Worker processes are fresh interpreters that import asgi:app,
+        # so the sizes reach their Config through the environment
+        os.environ['DORMMATE_ASGI_THREADS'] = str(args.threads)
+        os.environ['DORMMATE_ASGI_DB_THREADS'] = str(args.db_threads)
+        target = 'asgi:app'
+    else:
+        # Single process: serve an app built with the sizes we were given
+        target = build(args.threads, args.db_threads)
+
+    uvicorn.run(
+        target,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        lifespan='on',
+        timeout_graceful_shutdown=args.shutdown_timeout,
+    )
@@ -0,0 +1,308 @@
+"""
+Load test + micro-benchmark for the DormMate API.
+
+Logic: build a throwaway database of the requested size (seed.py) ->
+hit every endpoint N times at the given concurrency, through the Flask test
+client, a real threaded WSGI server or the uvicorn ASGI server -> report p50/p95/p99 latency,
+throughput and peak RSS -> optionally save as a baseline or compare
+against one.
+
+Examples:
+    python benchmark.py --tasks 50000 --save benchmark_baseline.json
+    python benchmark.py --tasks 50000 --compare benchmark_baseline.json --threshold 0.2
+    python benchmark.py --mode server --concurrency 16 --requests 500
+    python benchmark.py --mode compare --concurrency 64   # WSGI vs ASGI side by side
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# (name, method, path, json body) - every route in app/routes.py worth timing
+ENDPOINTS = [
+    ('GET /tasks', 'GET', '/tasks', None),
+    ('GET /tasks page', 'GET', '/tasks?limit=100&after_id=1000', None),
+    ('GET /tasks fields', 'GET', '/tasks?fields=id,title,status', None),
+    ('GET /tasks stream', 'GET', '/tasks?stream=1', None),
+    ('GET /roommates', 'GET', '/roommates', None),
+    ('GET /tasks/upcoming', 'GET', '/tasks/upcoming', None),
+    ('GET /tasks/overdue', 'GET', '/tasks/overdue', None),
+    ('GET /tasks/completed-week', 'GET', '/tasks/completed-week', None),
+    ('GET /rooms', 'GET', '/rooms', None),
+    ('GET /rooms viewport', 'GET', '/rooms?min_x=0&min_y=0&max_x=1200&max_y=800', None),
+    ('GET /stats', 'GET', '/stats', None),
+    ('POST /tasks', 'POST', '/tasks', {'title': 'Benchmark chore', 'priority': 'Low'}),
+    ('POST /tasks/bulk', 'POST', '/tasks/bulk',
+     [{'title': f'Benchmark chore {i}', 'priority': 'Low'} for i in range(100)]),
+    ('PATCH /tasks/bulk', 'PATCH', '/tasks/bulk',
+     [{'id': i, 'status': 'done'} for i in range(1, 101)]),
+    # DELETE /tasks/bulk is left out: repeated runs would only hit "task not found"
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DormMate API.")
+    parser.add_argument('--roommates', type=int, default=50)
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the dataset')
+    parser.add_argument('--mode', choices=['client', 'server', 'asgi', 'compare'], default='client',
+                        help='Flask test client (no network), a real threaded WSGI server, '
+                             'the uvicorn ASGI server, or server and asgi side by side')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed requests per endpoint')
+    parser.add_argument('--only', action='append', help='only run endpoints containing this text')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown before --compare fails (0.2 = 20%%)')
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+# --- DRIVERS ---
+# A driver is a callable (method, path, body) -> status code, safe to call from many threads.
+
+def client_driver(app):
+    local = threading.local()
+
+    def call(method, path, body):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = local.client.open(path, method=method, json=body)
+        response.get_data()  # drain streamed bodies too
+        return response.status_code
+
+    return call, lambda: None
+
+
+def server_driver(app):
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no access log per request
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return _http_call(f'http://127.0.0.1:{server.server_port}'), server.shutdown
+
+
+def _http_call(base):
+    import requests
+
+    local = threading.local()
+
+    def call(method, path, body):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()  # keep-alive per worker thread
+        response = local.session.request(method, base + path, json=body)
+        return response.status_code
+
+    return call
+
+
+def asgi_driver(app):
+    import socket
+    import uvicorn
+    from app.asgi import DormMateASGI
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(DormMateASGI(app), host='127.0.0.1', port=port,
+                                           lifespan='on', log_level='warning', access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def shutdown():
+        server.should_exit = True
+        thread.join()
+
+    return _http_call(f'http://127.0.0.1:{port}'), shutdown
+
+
+DRIVERS = {'client': client_driver, 'server': server_driver, 'asgi': asgi_driver}
+
+
+def run_endpoint(call, method, path, body, total, concurrency, warmup):
+    """Fire `total` requests with `concurrency` workers; returns the stats dict."""
+    for _ in range(warmup):
+        call(method, path, body)
+
+    def timed(_):
+        start = time.perf_counter()
+        status = call(method, path, body)
+        return time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    errors = sum(1 for _, status in samples if status >= 400)
+    return {
+        'requests': total,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'throughput_rps': round(total / elapsed, 1),
+    }
+
+
+# --- BASELINES ---
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions (p95 slower or throughput lower than allowed)."""
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        if before['p95_ms'] and now['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now['throughput_rps'] < before['throughput_rps'] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {before['throughput_rps']} -> {now['throughput_rps']} req/s")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'endpoint':32} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'err':>5}")
+    for name, r in results.items():
+        print(f"{name:32} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} "
+              f"{r['throughput_rps']:9.1f} {r['errors']:5}")
+
+
+def print_side_by_side(by_mode):
+    """One line per endpoint: p95 and throughput of each mode."""
+    modes = list(by_mode)
+    print(f"{'endpoint':32} " + ' '.join(f"{m + ' p95':>12} {m + ' req/s':>12}" for m in modes))
+    for name in by_mode[modes[0]]:
+        cells = ' '.join(f"{by_mode[m][name]['p95_ms']:12.2f} {by_mode[m][name]['throughput_rps']:12.1f}"
+                         for m in modes)
+        print(f"{name:32} {cells}")
+
+
+def run_mode(app, mode, args):
+    call, shutdown = DRIVERS[mode](app)
+    results = {}
+    try:
+        for name, method, path, body in ENDPOINTS:
+            if args.only and not any(text in name for text in args.only):
+                continue
+            results[name] = run_endpoint(call, method, path, body,
+                                         args.requests, args.concurrency, args.warmup)
+    finally:
+        shutdown()
+    return results
+
+
+def fresh_app(path, args):
+    """Seed a new database at `path` with the requested dataset, then create the app on it."""
+    from app import create_app, models
+    import seed
+
+    models.close_pool()
+    models.db_path = path
+    models.init_db()
+    seed.seed_data()
+    seed.seed_synthetic(args.roommates, args.rooms, args.tasks, args.seed)
+    return create_app()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Point the app at a throwaway database *before* importing it (Config reads env at import)
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['DORMMATE_DB'] = os.path.join(tmp.name, 'benchmark.db')
+    if not args.cache:
+        os.environ['DORMMATE_CACHE'] = '0'
+
+    try:
+        if args.mode == 'compare':
+            # The write endpoints change the data, so each server gets its own
+            # freshly seeded database (same seed) and its own app / cache
+            by_mode = {}
+            for mode in ('server', 'asgi'):
+                app = fresh_app(os.path.join(tmp.name, f'benchmark-{mode}.db'), args)
+                by_mode[mode] = run_mode(app, mode, args)
+            print_side_by_side(by_mode)
+            print(f"peak RSS: {peak_rss_mb()} MB")
+            return 0
+        app = fresh_app(os.environ['DORMMATE_DB'], args)
+        results = run_mode(app, args.mode, args)
+    finally:
+        tmp.cleanup()
+
+    report = {
+        'meta': {
+            'mode': args.mode,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'dataset': {'roommates': args.roommates, 'rooms': args.rooms, 'tasks': args.tasks},
+            'cache': args.cache,
+            'python': platform.python_version(),
+            'peak_rss_mb': peak_rss_mb(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+    print_table(results)
+    print(f"peak RSS: {report['meta']['peak_rss_mb']} MB")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # Numbers are only comparable for the same mode, concurrency and dataset
+        for key in ('mode', 'concurrency', 'dataset', 'cache'):
+            if baseline.get('meta', {}).get(key) != report['meta'][key]:
+                print(f"warning: baseline {key}={baseline['meta'].get(key)!r}, "
+                      f"this run {key}={report['meta'][key]!r}")
+        regressions = compare(results, baseline, args.threshold)
+        before_rss = baseline.get('meta', {}).get('peak_rss_mb')
+        if before_rss and report['meta']['peak_rss_mb'] > before_rss * (1 + args.threshold):
+            regressions.append(f"peak RSS {before_rss}MB -> {report['meta']['peak_rss_mb']}MB")
+        if regressions:
+            print(f"REGRESSIONS (>{args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
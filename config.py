@@ -1,5 +1,73 @@
-import os 
+import os
 
 class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-    DATABASE_PATH = os.path.join(BASE_DIR, 'database', 'dormmate.db')
\ No newline at end of file
+    DATABASE_PATH = os.getenv('DORMMATE_DB', os.path.join(BASE_DIR, 'database', 'dormmate.db'))
+
+    # SQLite connection pool
+    # How many idle connections we keep open between requests.
+    DB_POOL_SIZE = int(os.getenv('DORMMATE_DB_POOL_SIZE', 8))
+    # How many prepared statements each connection keeps compiled.
+    DB_STATEMENT_CACHE = 256
+    # How long (ms) a writer waits for a lock before "database is locked".
+    DB_BUSY_TIMEOUT = 5000
+    # Negative value = size in KiB (here 16 MiB page cache per connection).
+    DB_CACHE_SIZE = -16000
+    # Bytes of the file SQLite may memory-map for reads (here 128 MiB).
+    DB_MMAP_SIZE = 128 * 1024 * 1024
+
+    # Most items accepted by one /tasks/bulk request
+    BULK_MAX_ITEMS = 10000
+
+    # Live updates (GET /events)
+    EVENTS_BUFFER_SIZE = 500   # recent events kept for clients that reconnect
+    EVENTS_QUEUE_SIZE = 256    # events queued per client before it must resync
+    EVENTS_HEARTBEAT = 15      # seconds between keep-alive pings
+    EVENTS_RETRY_MS = 3000     # browser reconnect delay
+
+    # Overdue reminders (app/reminders.py)
+    REMINDERS_ENABLED = os.getenv('DORMMATE_REMINDERS', '0') == '1'
+    REMINDER_INTERVAL = int(os.getenv('DORMMATE_REMINDER_INTERVAL', 300))  # seconds between scans
+    REMINDER_RATE = 1.0        # emails per second
+    REMINDER_BURST = 5
+    REMINDER_MAX_RETRIES = 3
+    # No SMTP_HOST -> reminders are only printed (local stand-in sender)
+    SMTP_HOST = os.getenv('SMTP_HOST')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+    SMTP_USERNAME = os.getenv('SMTP_USERNAME')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', '1') == '1'
+    SMTP_FROM = os.getenv('SMTP_FROM')
+    SMTP_POOL_SIZE = 2
+
+    # Todoist sync (app/todoist_api.py)
+    TODOIST_API_TOKEN = os.getenv('TODOIST_API_TOKEN')
+    TODOIST_SYNC_ENABLED = os.getenv('DORMMATE_TODOIST_SYNC', '1') == '1'
+    TODOIST_BASE_URL = os.getenv('TODOIST_BASE_URL', 'https://api.todoist.com/sync/v9')
+    TODOIST_SYNC_INTERVAL = int(os.getenv('TODOIST_SYNC_INTERVAL', 120))  # seconds
+    TODOIST_CONNECT_TIMEOUT = 3.05
+    TODOIST_READ_TIMEOUT = 15
+    TODOIST_BATCH_SIZE = 500
+
+    # Instrumentation (app/metrics.py): GET /metrics in Prometheus format
+    METRICS_ENABLED = os.getenv('DORMMATE_METRICS', '0') == '1'
+    # Fraction of requests run under cProfile (0 = profiler off)
+    PROFILE_RATE = float(os.getenv('DORMMATE_PROFILE_RATE', 0))
+    PROFILE_DIR = os.getenv('DORMMATE_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+    PROFILE_KEEP = 20  # slowest profiles kept on disk
+
+    # ASGI serving mode (asgi.py)
+    ASGI_HOST = os.getenv('DORMMATE_ASGI_HOST', '127.0.0.1')
+    ASGI_PORT = int(os.getenv('DORMMATE_ASGI_PORT', 8000))
+    ASGI_WORKERS = int(os.getenv('DORMMATE_ASGI_WORKERS', 1))          # processes
+    ASGI_THREADS = int(os.getenv('DORMMATE_ASGI_THREADS', 16))         # Flask routes, per process
+    ASGI_DB_THREADS = int(os.getenv('DORMMATE_ASGI_DB_THREADS', 4))    # async queries, per process
+    ASGI_SHUTDOWN_TIMEOUT = int(os.getenv('DORMMATE_ASGI_SHUTDOWN_TIMEOUT', 10))  # seconds
+
+    # Response cache for the GET routes
+    CACHE_ENABLED = os.getenv('DORMMATE_CACHE', '1') != '0'
+    # Seconds a cached response may live (also bounds staleness of date-based views)
+    CACHE_TTL = int(os.getenv('DORMMATE_CACHE_TTL', 60))
+    CACHE_MAX_ENTRIES = 1024
+    # Set to e.g. redis://localhost:6379/0 to share the cache between workers
+    CACHE_REDIS_URL = os.getenv('DORMMATE_CACHE_REDIS_URL')
\ No newline at end of file
@@ -33,7 +33,9 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- STATE MANAGEMENT ---
     let tasks = [];
     let roommates = [];
-    let rooms = []; // For map
+    let rooms = []; // For the room dropdown
+    let mapRooms = []; // Rooms in the visible part of the map (with open_tasks)
+    let mapView = {x: 0, y: 0}; // Map coordinates shown at the top-left corner
     
     let currentFilters = {status: 'all', priority: 'all', roommate: 'all', search: ''};
     let currentSort = {priority: 'low-high', dueDate: 'near-far'};
@@ -56,6 +58,8 @@ document.addEventListener('DOMContentLoaded', () => {
                     sec.classList.add('hidden-section');
                 }
             });
+            // The map has no size while hidden, so load its viewport once it shows
+            if (target === 'map-section') updateMap();
         });
     });
 
@@ -63,9 +67,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- 2. FETCHING DATA (GET) ---
 
     async function fetchAllData() {
-        await Promise.all([fetchRooms(), fetchRoommates(), fetchTasks()]);
-        // We render the map last to ensure we have tasks count available
-        renderMap(); 
+        await Promise.all([fetchRooms(), fetchRoommates(), fetchTasks(), fetchMapRooms()]);
     }
 
     // A. Fetch Rooms (For Map & Dropdown)
@@ -82,20 +84,36 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    async function fetchRooms() {
-    try {
-        const res = await fetch(`${API_URL}/rooms`);
-        if (res.ok) {
-            rooms = await res.json();
-            // This line is what fills the dropdown!
-            populateRoomDropdown(); 
-            // This line draws the widgets on the map
-            renderMap(); 
+    // Map widgets: only the rooms inside the visible box, open task counts included
+    // (GET /rooms answers a bounding box from its spatial index)
+    const WIDGET_MARGIN = 150; // widgets are centred on pos_x/pos_y, keep half-visible ones
+    let mapTimer = null;
+
+    function updateMap() {
+        // Scrolling and task events come in bursts: ask the server once
+        clearTimeout(mapTimer);
+        mapTimer = setTimeout(fetchMapRooms, 150);
+    }
+
+    async function fetchMapRooms() {
+        const {clientWidth, clientHeight} = mapContainer;
+        if (!clientWidth) return; // map section not shown yet
+        const params = new URLSearchParams({
+            min_x: mapView.x - WIDGET_MARGIN,
+            min_y: mapView.y - WIDGET_MARGIN,
+            max_x: mapView.x + clientWidth + WIDGET_MARGIN,
+            max_y: mapView.y + clientHeight + WIDGET_MARGIN,
+        });
+        try {
+            const res = await fetch(`${API_URL}/rooms?${params}`);
+            if (res.ok) {
+                mapRooms = await res.json();
+                renderMap();
+            }
+        } catch (error) {
+            console.error("Error fetching map rooms:", error);
         }
-    } catch (error) {
-        console.error("Error fetching rooms:", error);
     }
-}
 
     // B. Fetch Roommates
     async function fetchRoommates() {
@@ -113,7 +131,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const res = await fetch(`${API_URL}/tasks`); // Or /tasks/upcoming based on view
         tasks = await res.json();
         renderTasks();
-        renderMap(); // Re-render map to update counters
+        updateMap(); // Room counters may have changed
+        updateStats(); // Update dashboard numbers
     }
 
 
@@ -214,7 +233,6 @@ document.addEventListener('DOMContentLoaded', () => {
         });
 
         attachTaskEvents();
-        updateStats(filtered); // Update dashboard numbers
     }
 
     // C. Render Roommate Table
@@ -280,7 +298,7 @@ document.addEventListener('DOMContentLoaded', () => {
             btn.addEventListener('click', async (e) => {
                 if(confirm('Remove this roommate?')) {
                     await fetch(`${API_URL}/roommates/${btn.dataset.id}`, {method: 'DELETE'});
-                    fetchRoommates(); 
+                    refreshAfterWrite(fetchRoommates); 
                 }
             });
         });
@@ -306,7 +324,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (res.ok) {
             e.target.reset();
             closeModal(); // Close popup
-            fetchRoommates(); // Refresh grid
+            refreshAfterWrite(fetchRoommates); // Refresh grid
         } else {
             const err = await res.json();
             alert("Error: " + err.error);
@@ -321,9 +339,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const mapContainer = document.getElementById('house-map');
         mapContainer.innerHTML = ''; 
         
-        rooms.forEach(room => {
-            const pendingTasks = tasks.filter(t => t.room_id === room.id && t.status !== 'done');
-            const count = pendingTasks.length;
+        mapRooms.forEach(room => {
+            const count = room.open_tasks;
             const isBusy = count > 0;
 
             // Set color theme
@@ -335,8 +352,8 @@ document.addEventListener('DOMContentLoaded', () => {
             // Create widget element
             const widget = document.createElement('div');
             widget.className = `room-widget ${selectedRoomId === room.id ? 'active' : ''}`;
-            widget.style.left = `${room.pos_x}px`;
-            widget.style.top = `${room.pos_y}px`;
+            widget.style.left = `${room.pos_x - mapView.x}px`;
+            widget.style.top = `${room.pos_y - mapView.y}px`;
 
             widget.innerHTML = `
                 <div class="status-dot ${isBusy ? 'bg-red' : 'bg-green'}"></div>
@@ -357,7 +374,7 @@ document.addEventListener('DOMContentLoaded', () => {
             // Handle widget click
             widget.addEventListener('click', (e) => {
                 e.stopPropagation(); // Prevent background click
-                selectRoom(room);
+                if (!mapDragged) selectRoom(room);
             });
 
             mapContainer.appendChild(widget);
@@ -417,9 +434,32 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Handle clicking empty map space
     document.getElementById('house-map').addEventListener('click', () => {
-        deselectRoom();
+        if (!mapDragged) deselectRoom();
     });
 
+    // --- MAP PANNING ---
+    // Drag the map to move around; the newly visible rooms are fetched once it settles
+    let dragStart = null;
+    let mapDragged = false;
+
+    mapContainer.addEventListener('pointerdown', e => {
+        dragStart = {x: e.clientX, y: e.clientY, view: {...mapView}};
+        mapDragged = false;
+    });
+
+    window.addEventListener('pointermove', e => {
+        if (!dragStart) return;
+        const dx = e.clientX - dragStart.x;
+        const dy = e.clientY - dragStart.y;
+        if (Math.abs(dx) + Math.abs(dy) > 3) mapDragged = true;
+        if (!mapDragged) return;
+        mapView = {x: dragStart.view.x - dx, y: dragStart.view.y - dy};
+        renderMap();
+        updateMap();
+    });
+
+    window.addEventListener('pointerup', () => { dragStart = null; });
+
     // Reset selection and sidebar
     function deselectRoom() {
         selectedRoomId = null;
@@ -429,18 +469,29 @@ document.addEventListener('DOMContentLoaded', () => {
         document.getElementById('sidebar-details').classList.add('hidden');
     }
 
-    function updateStats(currentTasks) {
-        // Upcoming (pending), Overdue, Completed
-        const now = new Date();
-        
-        const upcoming = tasks.filter(t => t.status !== 'done' && new Date(t.due_date) >= now).length;
-        const overdue = tasks.filter(t => t.status !== 'done' && new Date(t.due_date) < now).length;
-        // Completed logic would require filtering by date range, simplified here:
-        const completed = tasks.filter(t => t.status === 'done').length; 
-
-        document.getElementById('stat-upcoming').innerText = upcoming;
-        document.getElementById('stat-overdue').innerText = overdue;
-        document.getElementById('stat-completed').innerText = completed;
+    // Dashboard numbers come precomputed from GET /stats
+    // (no need to count through the whole task list here)
+    let statsTimer = null;
+
+    function updateStats() {
+        // Several task events can arrive together: ask the server once
+        clearTimeout(statsTimer);
+        statsTimer = setTimeout(fetchStats, 200);
+    }
+
+    async function fetchStats() {
+        try {
+            const res = await fetch(`${API_URL}/stats`);
+            if (!res.ok) return;
+            const {totals} = await res.json();
+
+            // Upcoming (due today or later, still pending), Overdue, Completed this week
+            document.getElementById('stat-upcoming').innerText = totals.upcoming + totals.due_today;
+            document.getElementById('stat-overdue').innerText = totals.overdue;
+            document.getElementById('stat-completed').innerText = totals.completed_this_week;
+        } catch (error) {
+            console.error("Error fetching stats:", error);
+        }
     }
 
 
@@ -465,7 +516,7 @@ document.addEventListener('DOMContentLoaded', () => {
         });
 
         e.target.reset();
-        fetchTasks(); // Reload data
+        refreshAfterWrite(fetchTasks); // Reload data
         alert("Task created!");
     });
 
@@ -485,7 +536,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         if (res.ok) {
             e.target.reset();
-            fetchRoommates();
+            refreshAfterWrite(fetchRoommates);
             alert("Roommate added!");
         } else {
             const err = await res.json();
@@ -506,7 +557,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({status: 'done'})
                 });
-                fetchTasks();
+                refreshAfterWrite(fetchTasks);
             });
         });
 
@@ -516,7 +567,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 if(confirm('Delete this task?')) {
                     const taskId = btn.dataset.id;
                     await fetch(`${API_URL}/tasks/${taskId}`, {method: 'DELETE'});
-                    fetchTasks();
+                    refreshAfterWrite(fetchTasks);
                 }
             });
         });
@@ -562,6 +613,68 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
 
+    // --- 6. LIVE UPDATES (Server-Sent Events) ---
+    // The backend pushes small row diffs after every write,
+    // so we patch our local arrays instead of reloading whole tables.
+    let liveConnected = false;
+    // Diffs can arrive out of commit order, so remember the version
+    // of the last diff applied per id (deletes included) and skip older ones
+    const seenVersions = { tasks: new Map(), roommates: new Map() };
+
+    function isStale(seen, id, version) {
+        return (seen.get(id) ?? -1) > version;
+    }
+
+    function applyDiff(list, diff, seen) {
+        if (diff.action === 'delete') {
+            diff.ids.forEach(id => {
+                if (!isStale(seen, id, diff.version)) seen.set(id, diff.version);
+            });
+            const removed = new Set(diff.ids);
+            return list.filter(item => !removed.has(item.id));
+        }
+        // upsert: replace rows we already have, append new ones
+        const byId = new Map(list.map(item => [item.id, item]));
+        diff.rows.forEach(row => {
+            if (isStale(seen, row.id, diff.version)) return;
+            seen.set(row.id, diff.version);
+            byId.set(row.id, {...byId.get(row.id), ...row});
+        });
+        return [...byId.values()];
+    }
+
+    // Without a live connection we fall back to reloading the list
+    function refreshAfterWrite(fetchFn) {
+        if (!liveConnected) fetchFn();
+    }
+
+    function connectLiveUpdates() {
+        if (!window.EventSource) return;
+
+        const source = new EventSource(`${API_URL}/events`);
+        source.onopen = () => { liveConnected = true; };
+        // The browser reconnects by itself (and replays what we missed via Last-Event-ID)
+        source.onerror = () => { liveConnected = false; };
+
+        source.addEventListener('tasks', e => {
+            tasks = applyDiff(tasks, JSON.parse(e.data), seenVersions.tasks);
+            renderTasks();
+            updateMap();
+            updateStats();
+        });
+
+        source.addEventListener('roommates', e => {
+            roommates = applyDiff(roommates, JSON.parse(e.data), seenVersions.roommates);
+            populateRoommateDropdowns();
+            renderRoommateTable();
+        });
+
+        // We missed too much while disconnected: reload everything once
+        source.addEventListener('resync', () => fetchAllData());
+    }
+
+
     // --- INITIALIZE ---
     fetchAllData();
+    connectLiveUpdates();
 });
\ No newline at end of file
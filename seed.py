@@ -1,4 +1,10 @@
-from app.models import get_db
+import argparse
+import random
+from datetime import date, timedelta
+
+from app.models import get_db, insert_tasks, update_task_statuses
+
+COLORS = ['blue', 'purple', 'orange', 'green']
 
 def seed_data():
     conn = get_db()
@@ -16,5 +22,74 @@ def seed_data():
     conn.close()
     print("Map rooms have been added!")
 
+def seed_roommates(count):
+    """Add `count` synthetic roommates (emails are unique per run)."""
+    conn = get_db()
+    start = conn.execute('SELECT COALESCE(MAX(id), 0) FROM roommates').fetchone()[0]
+    conn.executemany('INSERT INTO roommates (name, email) VALUES (?, ?)', [
+        (f'Roommate {n}', f'roommate{n}@dormmate.test') for n in range(start + 1, start + count + 1)
+    ])
+    conn.commit()
+    conn.close()
+    print(f"{count} roommates have been added!")
+
+def seed_rooms(count):
+    """Add `count` synthetic rooms laid out on a grid (one building = 20 x 20 rooms)."""
+    conn = get_db()
+    conn.executemany('INSERT INTO rooms (name, pos_x, pos_y, color) VALUES (?, ?, ?, ?)', [
+        (f'Room {n}', (n % 20) * 150 + (n // 400) * 3200, (n // 20) % 20 * 120, COLORS[n % len(COLORS)])
+        for n in range(count)
+    ])
+    conn.commit()
+    conn.close()
+    print(f"{count} rooms have been added!")
+
+def seed_tasks(count, done_ratio=0.3):
+    """
+    Add `count` synthetic tasks spread over the existing rooms and roommates.
+    Uses the same bulk insert as POST /tasks/bulk: one transaction for the whole batch.
+    About `done_ratio` of them are then marked done (so completed-week has data too).
+    """
+    conn = get_db()
+    room_ids = [r['id'] for r in conn.execute('SELECT id FROM rooms')] or [None]
+    roommate_ids = [r['id'] for r in conn.execute('SELECT id FROM roommates')] or [None]
+    today = date.today()
+
+    tasks = [{
+        'title': f'Chore #{i}',
+        'room_id': random.choice(room_ids),
+        'roommate_id': random.choice(roommate_ids),
+        'due_date': (today + timedelta(days=random.randint(-30, 30))).isoformat(),
+        'priority': random.choice(['Low', 'Medium', 'High']),
+    } for i in range(count)]
+
+    results = insert_tasks(conn, tasks)
+    done = [{'id': r['id'], 'status': 'done'} for r in results if random.random() < done_ratio]
+    if done:
+        update_task_statuses(conn, done)
+    conn.commit()
+    conn.close()
+    print(f"{count} tasks have been added ({len(done)} done)!")
+
+def seed_synthetic(roommates=0, rooms=0, tasks=0, seed=None):
+    """Generate a synthetic dataset of any size (used by benchmark.py)."""
+    if seed is not None:
+        random.seed(seed)
+    if roommates:
+        seed_roommates(roommates)
+    if rooms:
+        seed_rooms(rooms)
+    if tasks:
+        seed_tasks(tasks)
+
 if __name__ == "__main__":
-    seed_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fill the DormMate database.")
+    parser.add_argument('tasks', nargs='?', type=int, default=0,
+                        help='also add this many synthetic tasks (python seed.py 5000)')
+    parser.add_argument('--roommates', type=int, default=0, help='synthetic roommates to add')
+    parser.add_argument('--rooms', type=int, default=0, help='synthetic rooms to add (on top of the 4 map rooms)')
+    parser.add_argument('--seed', type=int, help='random seed for a reproducible dataset')
+    args = parser.parse_args()
+
+    seed_data()
+    seed_synthetic(args.roommates, args.rooms, args.tasks, args.seed)
\ No newline at end of file
@@ -0,0 +1,37 @@
+import pytest
+
+from app import create_app, models
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A fresh, fully migrated database per test (never the real one)."""
+    path = str(tmp_path / 'test.db')
+    models.close_pool()
+    monkeypatch.setattr(models, 'db_path', path)
+    models.init_db()
+    yield path
+    models.close_pool()
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = models.connect()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def client(db_path):
+    return create_app().test_client()
+
+
+@pytest.fixture
+def add_roommate(conn):
+    """add_roommate('Sam') -> id, with email sam@example.com"""
+    def add(name='Alex'):
+        cursor = conn.execute('INSERT INTO roommates (name, email) VALUES (?, ?)',
+                              (name, f'{name.lower()}@example.com'))
+        conn.commit()
+        return cursor.lastrowid
+    return add
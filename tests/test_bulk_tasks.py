@@ -0,0 +1,59 @@
+"""POST / PATCH / DELETE /tasks/bulk: one bad item never sinks the batch."""
+
+
+def test_bulk_create_reports_each_item(client):
+    response = client.post('/tasks/bulk', json=[
+        {'title': 'Dishes'},
+        {'title': ['not', 'a', 'string']},
+        {'description': 'no title'},
+        {'title': 'Trash', 'roommate_id': {}},
+        {'title': 'Floor', 'room_id': '2', 'roommate_id': ''},
+    ])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['succeeded'], body['failed']) == (2, 3)
+
+    results = body['results']
+    assert [r['index'] for r in results] == [0, 1, 2, 3, 4]
+    assert 'id' in results[0] and 'id' in results[4]
+    assert results[1]['error'] == 'title must be a string'
+    assert results[2]['error'] == 'title is required'
+    assert 'roommate_id' in results[3]['error']
+
+    tasks = {t['title']: t for t in client.get('/tasks').get_json()}
+    assert set(tasks) == {'Dishes', 'Floor'}
+    assert tasks['Floor']['room_id'] == 2 and tasks['Floor']['roommate_id'] is None
+
+
+def test_single_create_rejects_bad_field(client):
+    response = client.post('/tasks', json={'title': 't', 'roommate_id': {}})
+    assert response.status_code == 400
+    assert client.get('/tasks').get_json() == []
+
+
+def test_bulk_update_and_delete(client):
+    ids = [r['id'] for r in client.post('/tasks/bulk', json=[{'title': 'a'}, {'title': 'b'}])
+           .get_json()['results']]
+
+    response = client.patch('/tasks/bulk', json=[
+        {'id': ids[0], 'status': 'done'},
+        {'id': ids[1], 'status': {'a': 1}},
+        {'id': 999, 'status': 'done'},
+    ])
+    assert response.status_code == 200
+    errors = [r.get('error') for r in response.get_json()['results']]
+    assert errors == [None, 'status must be a string', 'task not found']
+
+    tasks = {t['id']: t for t in client.get('/tasks').get_json()}
+    assert tasks[ids[0]]['status'] == 'done' and tasks[ids[0]]['completed_at']
+    assert tasks[ids[1]]['status'] == 'Pending'
+
+    response = client.delete('/tasks/bulk', json=[ids[0], 999])
+    assert [r.get('error') for r in response.get_json()['results']] == [None, 'task not found']
+    assert [t['id'] for t in client.get('/tasks').get_json()] == [ids[1]]
+
+
+def test_all_bad_items_is_400(client):
+    response = client.post('/tasks/bulk', json=[{'title': None}])
+    assert response.status_code == 400
+    assert response.get_json()['succeeded'] == 0
@@ -0,0 +1,77 @@
+"""Response cache: entries follow the trigger-maintained table_versions."""
+import pytest
+
+from app import models
+from app.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def cache_on(monkeypatch):
+    monkeypatch.setattr(cache, 'enabled', True)
+
+
+def test_hit_then_miss_after_a_write(client):
+    assert client.get('/tasks').headers['X-Cache'] == 'MISS'
+    assert client.get('/tasks').headers['X-Cache'] == 'HIT'
+
+    client.post('/tasks', json={'title': 'Dishes'})
+    response = client.get('/tasks')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [t['title'] for t in response.get_json()] == ['Dishes']
+
+
+def test_writes_outside_this_process_are_seen(client):
+    assert client.get('/tasks').get_json() == []
+
+    # seed.py, another worker or the Todoist sync process: no Flask handler involved
+    other = models.connect()
+    other.execute("INSERT INTO tasks (title) VALUES ('From elsewhere')")
+    other.commit()
+    other.close()
+
+    response = client.get('/tasks')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [t['title'] for t in response.get_json()] == ['From elsewhere']
+
+
+def test_moved_room_is_not_served_stale(client, conn):
+    conn.execute("INSERT INTO rooms (name, pos_x, pos_y, color) VALUES ('Kitchen', 10, 10, 'blue')")
+    conn.commit()
+    assert client.get('/rooms').get_json()[0]['pos_x'] == 10
+
+    conn.execute('UPDATE rooms SET pos_x = 500 WHERE id = 1')
+    conn.commit()
+    response = client.get('/rooms')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()[0]['pos_x'] == 500
+
+
+def test_entries_that_are_not_ours_count_as_a_miss(client):
+    client.get('/tasks')
+    for key in list(cache.backend._data):
+        cache.backend.set(key, b'\x80\x04 not json')
+    assert client.get('/tasks').headers['X-Cache'] == 'MISS'
+
+
+def test_etag_and_cached_body_agree(client):
+    first = client.get('/tasks')
+    old_etag = first.headers['ETag']
+    assert first.get_json() == []
+
+    other = models.connect()
+    other.execute("INSERT INTO tasks (title) VALUES ('New')")
+    other.commit()
+    other.close()
+
+    # The old ETag is no longer current: full body, new ETag
+    response = client.get('/tasks', headers={'If-None-Match': old_etag})
+    assert response.status_code == 200
+    assert [t['title'] for t in response.get_json()] == ['New']
+    new_etag = response.headers['ETag']
+    assert new_etag != old_etag
+
+    # The new ETag matches what is served now, with or without a cached entry
+    assert client.get('/tasks', headers={'If-None-Match': new_etag}).status_code == 304
+    cache.backend._data.clear()
+    assert client.get('/tasks', headers={'If-None-Match': new_etag}).status_code == 304
+    assert client.get('/tasks').get_json()[0]['title'] == 'New'
@@ -0,0 +1,91 @@
+"""Live updates: what the write handlers publish, the /events stream, replay."""
+import json
+
+import pytest
+
+from app.events import EventBroker, broker
+
+
+@pytest.fixture
+def published():
+    """Collect the (event, data) pairs published during a test."""
+    subscriber = broker.subscribe()
+    messages = []
+
+    def drain():
+        while not subscriber.queue.empty():
+            _, event, data = subscriber.queue.get_nowait()
+            messages.append((event, json.loads(data)))
+        return messages
+    yield drain
+    broker.unsubscribe(subscriber)
+
+
+def test_write_handlers_publish_versioned_diffs(client, published):
+    task_id = client.post('/tasks', json={'title': 'Dishes'}).get_json()['id']
+    client.put(f'/tasks/{task_id}', json={'title': 'Dishes done right'})
+    client.delete(f'/tasks/{task_id}')
+
+    (_, created), (_, updated), (_, deleted) = published()
+    assert created['action'] == updated['action'] == 'upsert'
+    assert updated['rows'][0]['id'] == task_id and updated['rows'][0]['title'] == 'Dishes done right'
+    assert deleted == {'action': 'delete', 'version': deleted['version'], 'ids': [task_id]}
+    # Commit order is version order, whatever order the diffs arrive in
+    assert created['version'] < updated['version'] < deleted['version']
+
+
+def test_deleting_a_roommate_publishes_the_unassigned_tasks(client, add_roommate, published):
+    roommate_id = add_roommate('Sam')
+    client.post('/tasks', json={'title': 'Trash', 'roommate_id': roommate_id})
+    published().clear()
+
+    client.delete(f'/roommates/{roommate_id}')
+    (event, gone), (task_event, task_diff) = published()
+    assert (event, gone['ids']) == ('roommates', [roommate_id])
+    assert task_event == 'tasks' and task_diff['rows'][0]['roommate_id'] is None
+
+
+def test_events_stream_replays_missed_diffs(client):
+    client.post('/tasks', json={'title': 'Dishes'})
+    last = broker._recent[-1][1]
+
+    response = client.get('/events', headers={'Last-Event-ID': f'{broker.epoch}-{broker._next_id - 2}'},
+                          buffered=False)
+    try:
+        assert response.mimetype == 'text/event-stream'
+        chunks = iter(response.response)
+        assert next(chunks).startswith(b'retry: ')
+        event = next(chunks).decode()
+    finally:
+        response.close()
+    event_id, name, data = last
+    assert event == f'id: {event_id}\nevent: {name}\ndata: {data}\n\n'
+    assert json.loads(data)['rows'][0]['title'] == 'Dishes'
+
+
+def test_events_stream_asks_unknown_ids_to_resync(client):
+    response = client.get('/events', headers={'Last-Event-ID': 'deadbeef-1'}, buffered=False)
+    try:
+        chunks = iter(response.response)
+        next(chunks)
+        assert next(chunks) == b'event: resync\ndata: {}\n\n'
+    finally:
+        response.close()
+
+
+def test_replay_from_this_process():
+    broker = EventBroker(buffer_size=3)
+    for i in range(5):
+        broker.publish('tasks', {'i': i})
+
+    assert [m[0] for m in broker.replay(f'{broker.epoch}-3')] == [f'{broker.epoch}-4',
+                                                                  f'{broker.epoch}-5']
+    assert broker.replay(f'{broker.epoch}-5') == []
+    assert broker.replay(f'{broker.epoch}-1') is None  # fell out of the buffer
+
+
+def test_ids_from_another_process_ask_for_resync():
+    broker = EventBroker()
+    assert broker.replay('57') is None  # old numeric id, or a server restart
+    broker.publish('tasks', {})
+    assert broker.replay('deadbeef-1') is None
@@ -0,0 +1,29 @@
+"""Schema migrations when several worker processes start at the same time."""
+import threading
+
+from app import models
+
+
+def test_concurrent_init_db_migrates_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(models, 'db_path', str(tmp_path / 'fresh.db'))
+    errors = []
+
+    def start_worker():
+        try:
+            models.init_db()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=start_worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    conn = models.connect()
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(models.MIGRATIONS)
+        assert conn.execute("SELECT COUNT(*) FROM table_versions").fetchone()[0] == len(models.VERSIONED_TABLES)
+    finally:
+        conn.close()
@@ -0,0 +1,28 @@
+"""GET /tasks paging parameters."""
+import pytest
+
+
+@pytest.mark.parametrize('query', ['after_id=abc', 'limit=abc', 'limit=', 'limit=0', 'limit=-1'])
+def test_bad_paging_params_are_rejected(client, query):
+    assert client.get(f'/tasks?{query}').status_code == 400
+
+
+def test_keyset_pages(client):
+    client.post('/tasks/bulk', json=[{'title': str(i)} for i in range(5)])
+    first = client.get('/tasks?limit=2')
+    assert [t['id'] for t in first.get_json()] == [1, 2]
+    assert first.headers['X-Next-After-Id'] == '2'
+    rest = client.get('/tasks?after_id=2&limit=10&fields=id')
+    assert rest.get_json() == [{'id': 3}, {'id': 4}, {'id': 5}]
+    assert 'X-Next-After-Id' not in rest.headers
+
+
+def test_streamed_pages_carry_the_cursor(client):
+    client.post('/tasks/bulk', json=[{'title': str(i)} for i in range(5)])
+    first = client.get('/tasks?stream=1&limit=2')
+    assert [t['id'] for t in first.get_json()] == [1, 2]
+    assert first.headers['X-Next-After-Id'] == '2'
+
+    last = client.get('/tasks?stream=1&after_id=4&limit=2')
+    assert [t['id'] for t in last.get_json()] == [5]
+    assert 'X-Next-After-Id' not in last.headers
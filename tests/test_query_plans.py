@@ -0,0 +1,51 @@
+"""
+Query plan regression check: every hot query must stay on its index.
+Fails (in CI) as soon as SQLite falls back to a full table scan.
+"""
+import pytest
+
+from app.reminders import NEW_OVERDUE_SQL
+from app.routes import COMPLETED_WEEK_SQL, OVERDUE_TASKS_SQL, ROOMS_IN_VIEW_SQL, UPCOMING_TASKS_SQL
+
+# name -> (sql, params, index we expect SQLite to pick)
+CHECKS = {
+    'upcoming': (UPCOMING_TASKS_SQL, (), 'idx_tasks_open_due'),
+    'overdue': (OVERDUE_TASKS_SQL, (), 'idx_tasks_open_due'),
+    'completed-week': (COMPLETED_WEEK_SQL, (), 'idx_tasks_done_completed'),
+    'unassign-roommate': ('UPDATE tasks SET roommate_id = NULL WHERE roommate_id = ?', (1,),
+                          'idx_tasks_roommate'),
+    'reminders': (NEW_OVERDUE_SQL, ('2030-01-01',), 'idx_tasks_open_due'),
+    'rooms-viewport': (ROOMS_IN_VIEW_SQL, {'min_x': 0, 'min_y': 0, 'max_x': 1000, 'max_y': 800},
+                       'box VIRTUAL TABLE'),
+}
+
+
+def explain(conn, sql, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for one statement."""
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def is_full_scan(line):
+    if not line.startswith('SCAN') or 'USING' in line:
+        return False
+    # R*Tree lookups show up as "SCAN x VIRTUAL TABLE INDEX 2:D1B0..." (the box constraints);
+    # nothing after the colon means every entry is read
+    if 'VIRTUAL TABLE INDEX' in line:
+        return line.rsplit(':', 1)[1] == ''
+    return True
+
+
+@pytest.mark.parametrize('name', CHECKS)
+def test_query_uses_index(conn, name):
+    sql, params, index = CHECKS[name]
+    plan = explain(conn, sql, params)
+    assert not [line for line in plan if is_full_scan(line)], plan
+    assert any(index in line for line in plan), plan
+
+
+def test_full_scan_detection():
+    assert is_full_scan('SCAN tasks')
+    assert is_full_scan('SCAN box VIRTUAL TABLE INDEX 2:')
+    assert not is_full_scan('SCAN box VIRTUAL TABLE INDEX 2:D1B0D3B2')
+    assert not is_full_scan('SCAN t USING INDEX idx_tasks_open_due')
+    assert not is_full_scan('SEARCH t USING INTEGER PRIMARY KEY (rowid=?)')
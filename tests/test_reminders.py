@@ -0,0 +1,121 @@
+"""Overdue reminders: run_once() with the in-memory LocalSender."""
+import smtplib
+
+import pytest
+
+from app import models
+from app.reminders import (LocalSender, RateLimiter, ReminderDispatcher, SMTPSender,
+                           claim, find_new_overdue, run_once)
+
+TODAY = '2026-10-18'
+
+
+def dispatcher(sender):
+    return ReminderDispatcher(sender, RateLimiter(rate=1000, burst=100), max_retries=0)
+
+
+def add_task(conn, title, roommate_id, due_date, status='Pending'):
+    cursor = conn.execute(
+        'INSERT INTO tasks (title, roommate_id, due_date, status) VALUES (?, ?, ?, ?)',
+        (title, roommate_id, due_date, status))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def test_one_email_per_roommate_and_no_resend(conn, add_roommate):
+    alex = add_roommate('Alex')
+    sam = add_roommate('Sam')
+    add_task(conn, 'Dishes', alex, '2026-10-01')
+    add_task(conn, 'Trash', alex, '2026-10-10')
+    add_task(conn, 'Floor', sam, '2026-10-17')
+    add_task(conn, 'Later', sam, '2026-11-01')
+    add_task(conn, 'Finished', sam, '2026-10-01', status='done')
+
+    sender = LocalSender()
+    assert run_once(conn, dispatcher(sender), TODAY) == (2, 0)
+    by_email = {m['to']: m for m in sender.outbox}
+    assert by_email['alex@example.com']['subject'] == 'DormMate: 2 overdue tasks'
+    assert 'Floor' in by_email['sam@example.com']['body']
+    assert 'Later' not in by_email['sam@example.com']['body']
+
+    assert run_once(conn, dispatcher(sender), TODAY) == (0, 0)
+    assert len(sender.outbox) == 2
+
+
+def test_edited_and_reopened_tasks_are_picked_up(conn, add_roommate):
+    alex = add_roommate()
+    moved = add_task(conn, 'Moved', alex, '2026-12-01')
+    reopened = add_task(conn, 'Reopened', alex, '2026-09-01', status='done')
+    sender = LocalSender()
+    assert run_once(conn, dispatcher(sender), TODAY) == (0, 0)
+
+    # Same changes PUT /tasks/<id> and PATCH /tasks/bulk make
+    conn.execute("UPDATE tasks SET due_date = '2026-10-01' WHERE id = ?", (moved,))
+    conn.execute("UPDATE tasks SET status = 'Pending' WHERE id = ?", (reopened,))
+    conn.commit()
+
+    assert run_once(conn, dispatcher(sender), TODAY) == (1, 0)
+    assert 'Moved' in sender.outbox[0]['body'] and 'Reopened' in sender.outbox[0]['body']
+
+
+def test_failed_send_is_retried_next_scan(conn, add_roommate):
+    add_task(conn, 'Dishes', add_roommate(), '2026-10-01')
+
+    class Down:
+        def send(self, to, subject, body):
+            raise smtplib.SMTPServerDisconnected('down')
+
+    assert run_once(conn, ReminderDispatcher(Down(), RateLimiter(1000, 100), max_retries=0,
+                                             sleep=lambda s: None), TODAY) == (0, 1)
+    sender = LocalSender()
+    assert run_once(conn, dispatcher(sender), TODAY) == (1, 0)
+
+
+def test_bad_address_only_fails_its_own_email(conn, add_roommate):
+    alex = add_roommate('Alex')
+    # Written before the roommate routes validated emails
+    broken = conn.execute("INSERT INTO roommates (name, email) VALUES ('Bad', 'bad@example.com\r\nBcc: x@y.z')").lastrowid
+    add_task(conn, 'Dishes', broken, '2026-10-01')
+    add_task(conn, 'Trash', alex, '2026-10-01')
+
+    class Strict(LocalSender):
+        def send(self, to, subject, body):
+            if '\n' in to:  # what EmailMessage does with such a header
+                raise ValueError('Header values may not contain linefeed or carriage return characters')
+            super().send(to, subject, body)
+
+    sender = Strict()
+    assert run_once(conn, dispatcher(sender), TODAY) == (1, 1)
+    assert [m['to'] for m in sender.outbox] == ['alex@example.com']
+
+    # The failed group was not marked as sent
+    conn.execute("UPDATE roommates SET email = 'bad@example.com' WHERE id = ?", (broken,))
+    conn.commit()
+    assert run_once(conn, dispatcher(sender), TODAY) == (1, 0)
+
+
+def test_concurrent_scanners_send_once(db_path, conn, add_roommate):
+    add_task(conn, 'Dishes', add_roommate(), '2026-10-01')
+    other = models.connect()
+    try:
+        # Both scanners found the task before either one claimed it
+        rows = find_new_overdue(other, TODAY)
+        first, second = LocalSender(), LocalSender()
+        assert run_once(conn, dispatcher(first), TODAY) == (1, 0)
+        assert claim(other, rows) == []
+        assert run_once(other, dispatcher(second), TODAY) == (0, 0)
+    finally:
+        other.close()
+    assert len(first.outbox) == 1 and second.outbox == []
+
+
+def test_smtp_sender_needs_a_from_address():
+    with pytest.raises(ValueError):
+        SMTPSender('smtp.example.com')
+
+
+def test_roommate_routes_reject_header_breaking_emails(client):
+    assert client.post('/roommates', json={'name': 'Bad', 'email': 'a@b.c\nBcc: x@y.z'}).status_code == 400
+    assert client.post('/roommates', json={'name': 'Bad', 'email': 'not-an-email'}).status_code == 400
+    assert client.post('/roommates', json={'name': 'Sam', 'email': 'sam@example.com'}).status_code == 201
+    assert client.put('/roommates/1', json={'name': 'Sam', 'email': 'sam@example.com\r\n'}).status_code == 400
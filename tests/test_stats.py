@@ -0,0 +1,55 @@
+"""GET /stats aggregates stay equal to a full recount after any mix of writes."""
+from app.stats import read_stats, rebuild, verify
+
+
+def test_aggregates_follow_mixed_writes(client, conn, add_roommate):
+    alex = add_roommate('Alex')
+    sam = add_roommate('Sam')
+    conn.execute("INSERT INTO rooms (name, pos_x, pos_y, color) VALUES ('Kitchen', 0, 0, 'blue')")
+    conn.commit()
+
+    ids = [r['id'] for r in client.post('/tasks/bulk', json=[
+        {'title': 'a', 'roommate_id': alex, 'room_id': 1, 'due_date': '2020-01-01'},
+        {'title': 'b', 'roommate_id': sam, 'due_date': '2099-01-01'},
+        {'title': 'c', 'roommate_id': alex},
+        {'title': 'd'},
+    ]).get_json()['results']]
+    client.post('/tasks', json={'title': 'e', 'room_id': 1})
+    client.patch('/tasks/bulk', json=[{'id': ids[0], 'status': 'done'}, {'id': ids[1], 'status': 'done'}])
+    client.patch('/tasks/bulk', json=[{'id': ids[1], 'status': 'Pending'}])  # reopened
+    client.put(f'/tasks/{ids[2]}', json={'title': 'c2', 'due_date': '2020-02-02', 'room_id': 1,
+                                         'priority': 'High'})
+    client.delete('/tasks/bulk', json=[ids[3]])
+    client.delete(f'/roommates/{sam}')
+
+    assert verify(conn) == []
+
+    stats = client.get('/stats').get_json()
+    assert stats['totals']['open'] == 3 and stats['totals']['done'] == 1
+    assert stats['totals']['overdue'] == 1  # c2
+    assert {r['room_id']: r['open'] for r in stats['per_room']} == {0: 1, 1: 2}
+
+
+def test_verify_reports_drift_and_rebuild_fixes_it(conn):
+    conn.execute("INSERT INTO tasks (title) VALUES ('x')")
+    conn.execute("UPDATE task_counts SET open_count = 42 WHERE scope = 'all'")
+    conn.commit()
+    assert verify(conn)
+
+    rebuild(conn)
+    assert verify(conn) == []
+    assert read_stats(conn)['totals']['open'] == 1
+
+
+def test_rebuild_changes_the_stats_etag(client, conn):
+    conn.execute("INSERT INTO tasks (title) VALUES ('x')")
+    conn.execute("UPDATE task_counts SET open_count = 42 WHERE scope = 'all'")
+    conn.commit()
+    before = client.get('/stats')
+    assert before.get_json()['totals']['open'] == 42
+
+    rebuild(conn)
+    after = client.get('/stats', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert after.get_json()['totals']['open'] == 1
@@ -0,0 +1,108 @@
+"""Todoist sync against a local fake of the Sync API (canned /sync payloads)."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from app.todoist_api import TodoistClient, TodoistSyncWorker, sync_once
+
+FULL = {'sync_token': 't1', 'full_sync': True, 'items': [
+    {'id': 'a1', 'content': 'Buy soap', 'priority': 4, 'due': {'date': '2026-10-20T10:00:00'}},
+    {'id': 'a2', 'content': 'Vacuum', 'checked': True, 'completed_at': '2026-10-17T09:00:00Z'},
+]}
+UPDATE = {'sync_token': 't2', 'full_sync': False, 'items': [
+    {'id': 'a1', 'content': 'Buy soap x2', 'priority': 1},
+    {'id': 'a2', 'is_deleted': True},
+]}
+
+
+@pytest.fixture
+def todoist():
+    """A fake Todoist: answers each sync_token from `responses`, records the requests."""
+    server_state = {'responses': {'*': FULL, 't1': UPDATE}, 'requests': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+            token = form['sync_token'][0]
+            server_state['requests'].append((self.path, token, self.headers['Authorization']))
+            if token not in server_state['responses']:
+                self.send_error(404)
+                return
+            body = json.dumps(server_state['responses'][token]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    client = TodoistClient('secret', base_url=f'http://127.0.0.1:{server.server_port}', timeout=5)
+    client.state = server_state
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def tasks(conn):
+    return {row['todoist_id']: dict(row) for row in conn.execute(
+        'SELECT todoist_id, title, due_date, priority, status, completed_at FROM tasks')}
+
+
+def test_full_sync_maps_items(conn, todoist):
+    assert sync_once(conn, todoist) == (2, 0)
+    assert tasks(conn) == {
+        'a1': {'todoist_id': 'a1', 'title': 'Buy soap', 'due_date': '2026-10-20',
+               'priority': 'High', 'status': 'Pending', 'completed_at': None},
+        'a2': {'todoist_id': 'a2', 'title': 'Vacuum', 'due_date': None,
+               'priority': 'Low', 'status': 'done', 'completed_at': '2026-10-17 09:00:00'},
+    }
+    assert todoist.state['requests'] == [('/sync', '*', 'Bearer secret')]
+
+
+def test_incremental_sync_uses_the_stored_token(conn, todoist):
+    sync_once(conn, todoist)
+    assert sync_once(conn, todoist) == (1, 1)
+
+    assert [token for _, token, _ in todoist.state['requests']] == ['*', 't1']
+    assert conn.execute(
+        "SELECT value FROM scheduler_state WHERE name = 'todoist_sync_token'").fetchone()[0] == 't2'
+    # a1 updated in place, a2 deleted
+    assert list(tasks(conn)) == ['a1']
+    assert tasks(conn)['a1']['title'] == 'Buy soap x2' and tasks(conn)['a1']['priority'] == 'Low'
+
+
+def test_repeated_items_are_upserted_not_duplicated(conn, todoist):
+    todoist.state['responses'] = {'*': FULL, 't1': FULL}
+    sync_once(conn, todoist)
+    first = {row['todoist_id']: row['id'] for row in conn.execute('SELECT id, todoist_id FROM tasks')}
+    sync_once(conn, todoist)
+    again = {row['todoist_id']: row['id'] for row in conn.execute('SELECT id, todoist_id FROM tasks')}
+    assert again == first and len(first) == 2
+
+
+def test_worker_keeps_syncing_after_a_failed_round(db_path, conn, todoist):
+    todoist.state['responses'] = {}  # every call fails with a 404
+    worker = TodoistSyncWorker(todoist, interval=0.05)
+    worker.start()
+    try:
+        for _ in range(40):
+            if todoist.state['requests']:
+                break
+            worker._stop_event.wait(0.05)
+        todoist.state['responses']['*'] = FULL
+        for _ in range(40):
+            if tasks(conn):
+                break
+            worker._stop_event.wait(0.05)
+    finally:
+        worker.stop(timeout=5)
+    assert set(tasks(conn)) == {'a1', 'a2'}
+    assert not worker.is_alive()